@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import uit_device_types
+
+
+class TestDeviceTypeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        cache_file = Path(self.tmpdir.name) / "device_types.json"
+        patcher = mock.patch.object(uit_device_types, "DEVICE_TYPE_CACHE_FILE", cache_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(uit_device_types._device_type_cache.clear)
+        uit_device_types._device_type_cache.clear()
+
+    def test_cached_device_type_skips_autodetect(self):
+        uit_device_types._device_type_cache["10.0.0.1"] = "cisco_ios"
+        self.assertEqual(uit_device_types.get_device_type({"host": "10.0.0.1"}), "cisco_ios")
+
+    def test_device_type_guessed_from_subnet(self):
+        uit_device_types._device_type_cache["10.0.0.1"] = "cisco_xe"
+        uit_device_types._device_type_cache["10.0.0.2"] = "cisco_xe"
+        self.assertEqual(uit_device_types.guess_device_type("10.0.0.3"), "cisco_xe")
+        self.assertNotIn("10.0.0.3", uit_device_types._device_type_cache)  # Guesses are never cached
+
+    def test_single_neighbor_is_not_guessed(self):
+        uit_device_types._device_type_cache["10.0.0.1"] = "cisco_xe"
+        self.assertIsNone(uit_device_types.guess_device_type("10.0.0.3"))
+
+    def test_mixed_subnet_is_not_guessed(self):
+        uit_device_types._device_type_cache["10.0.0.1"] = "cisco_xe"
+        uit_device_types._device_type_cache["10.0.0.2"] = "cisco_nxos"
+        uit_device_types._device_type_cache["10.0.1.1"] = "cisco_ios"
+        self.assertIsNone(uit_device_types.guess_device_type("10.0.0.3"))
+        self.assertIsNone(uit_device_types.guess_device_type("fe80::1"))
+
+    def test_save_and_load_round_trip(self):
+        uit_device_types._device_type_cache["10.0.0.1"] = "cisco_xe"
+        uit_device_types.save_device_type_cache()
+        uit_device_types._device_type_cache.clear()
+        uit_device_types.load_device_type_cache()
+        self.assertEqual(uit_device_types._device_type_cache, {"10.0.0.1": "cisco_xe"})
+
+    def test_missing_file_leaves_cache_empty(self):
+        uit_device_types.load_device_type_cache()
+        self.assertEqual(uit_device_types._device_type_cache, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
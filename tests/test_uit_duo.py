@@ -0,0 +1,128 @@
+import unittest
+import requests
+import uit_duo
+from uit_duo import LoginError, extract_query_parameter, get_form_args, get_form_fields
+
+
+class TestGetFormArgs(unittest.TestCase):
+
+    def test_name_before_value(self):
+        html_doc = '<form><input type="hidden" name="execution" value="e1s1"/></form>'
+        self.assertEqual(get_form_args(html_doc, "execution"), "e1s1")
+
+    def test_value_before_name(self):
+        html_doc = "<form><input value='abc123' type='hidden' name='_xsrf'></form>"
+        self.assertEqual(get_form_args(html_doc, "_xsrf"), "abc123")
+
+    def test_entities_are_unescaped(self):
+        html_doc = '<input name="sysparm_ck" value="a&amp;b">'
+        self.assertEqual(get_form_args(html_doc, "sysparm_ck"), "a&b")
+
+    def test_similar_attribute_names_are_ignored(self):
+        html_doc = '<input data-name="execution" value="wrong" name="other"><input name="execution" value="right">'
+        self.assertEqual(get_form_args(html_doc, "execution"), "right")
+
+    def test_non_input_elements_fall_back_to_parser(self):
+        html_doc = '<form><button name="SAMLResponse" value="PHNhbWw+"></button></form>'
+        self.assertEqual(get_form_args(html_doc, "SAMLResponse"), "PHNhbWw+")
+
+    def test_bytes_document(self):
+        html_doc = '<input type="hidden" name="_xsrf" value="x&amp;y\u00e9">'.encode()
+        self.assertEqual(get_form_args(html_doc, "_xsrf"), "x&y\u00e9")
+        self.assertEqual(get_form_args(b'<button name="SAMLResponse" value="PHNh"></button>', "SAMLResponse"), "PHNh")
+
+    def test_missing_name_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            get_form_args('<form><input name="execution"></form>', "execution")
+        with self.assertRaises(KeyError):
+            get_form_args("<form></form>", "execution")
+
+
+class TestGetFormFields(unittest.TestCase):
+
+    def test_multiple_fields(self):
+        html_doc = '<input name="execution" value="e1s1"><input name="_eventId" value="submit">'
+        self.assertEqual(
+            get_form_fields(html_doc, "execution", "_eventId"),
+            {"execution": "e1s1", "_eventId": "submit"},
+        )
+
+    def test_mixed_regex_and_parser_fields(self):
+        html_doc = '<input name="execution" value="e1s1"><select name="lt" value="LT-1"></select>'
+        self.assertEqual(
+            get_form_fields(html_doc, "execution", "lt"),
+            {"execution": "e1s1", "lt": "LT-1"},
+        )
+
+    def test_empty_document_raises_key_error(self):
+        for html_doc in (b"", "", b"   "):
+            with self.subTest(html_doc=html_doc):
+                with self.assertRaises(KeyError):
+                    get_form_fields(html_doc, "execution")
+
+    def test_missing_field_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            get_form_fields('<input name="execution" value="e1s1">', "execution", "_xsrf")
+
+
+class TestExtractQueryParameter(unittest.TestCase):
+
+    def test_value_is_unquoted(self):
+        url = "https://api.duosecurity.com/frame/v4/auth/prompt?xsid=1&sid=frame-v4%2Fab+cd&tx=2#top"
+        self.assertEqual(extract_query_parameter(url, "sid"), "frame-v4/ab cd")
+
+    def test_missing_or_blank_parameter_raises_value_error(self):
+        for url in (
+            "https://example.com/?xsid=1",
+            "https://example.com/?sid=",
+            "https://example.com/",
+            "https://example.com/#top?sid=1",
+        ):
+            with self.assertRaises(ValueError):
+                extract_query_parameter(url, "sid")
+
+
+class TestPollDelay(unittest.TestCase):
+
+    def test_retry_after_is_capped(self):
+        response = requests.Response()
+        response.headers["Retry-After"] = "3600"
+        self.assertEqual(uit_duo._poll_delay(0, response), 2.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    url = "https://duo.example.com/frame/v4/status"
+
+    def setUp(self):
+        uit_duo._BREAKER.clear()
+
+    def _fail_request(self, error, ignore=()):
+        with self.assertRaises(type(error)):
+            with uit_duo._circuit_breaker(self.url, ignore):
+                raise error
+
+    def test_opens_after_threshold_failures(self):
+        for _ in range(uit_duo._BREAKER_THRESHOLD):
+            self._fail_request(requests.ConnectionError())
+        with self.assertRaises(LoginError):
+            with uit_duo._circuit_breaker(self.url):
+                pass
+
+    def test_client_errors_do_not_count(self):
+        response = requests.Response()
+        response.status_code = 404
+        for _ in range(uit_duo._BREAKER_THRESHOLD):
+            self._fail_request(requests.HTTPError(response=response))
+        with uit_duo._circuit_breaker(self.url):
+            pass
+
+    def test_ignored_errors_do_not_count(self):
+        for _ in range(uit_duo._BREAKER_THRESHOLD):
+            self._fail_request(requests.ReadTimeout(), ignore=(requests.ReadTimeout,))
+        with uit_duo._circuit_breaker(self.url):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
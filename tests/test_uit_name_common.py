@@ -0,0 +1,60 @@
+import unittest
+from argparse import ArgumentTypeError
+from uit_name_common import BANNER_BODY, location_generator, name_generator, switch_commands_generator, validate_ip_address
+
+
+class TestValidateIpAddress(unittest.TestCase):
+
+    def test_valid_addresses(self):
+        self.assertEqual(validate_ip_address("10.0.0.1"), "10.0.0.1")
+
+    def test_invalid_address(self):
+        with self.assertRaises(ArgumentTypeError):
+            validate_ip_address("10.0.0")
+
+    def test_ipv6_address_is_rejected(self):
+        with self.assertRaises(ArgumentTypeError):
+            validate_ip_address("fe80::1")
+
+
+class TestNameGenerator(unittest.TestCase):
+
+    def test_name_generator(self):
+        self.assertEqual(name_generator("sx", "1", "123", "MEB", "45", "a"), "sx1-0123meb-0045-a")
+
+    def test_numeric_short_name_gets_hyphen(self):
+        self.assertEqual(name_generator("dx", "2", "45", "1 ST", "12", "b"), "dx2-0045-1st-0012-b")
+
+
+class TestLocationGenerator(unittest.TestCase):
+
+    def test_pads_numbers(self):
+        self.assertEqual(location_generator("123", "45"), "Bldg. 0123 Room 0045")
+
+    def test_room_name_is_not_padded(self):
+        self.assertEqual(location_generator("0123", "mdf"), "Bldg. 0123 Room mdf")
+
+
+class TestSwitchCommandsGenerator(unittest.TestCase):
+
+    def test_switch_commands_generator(self):
+        commands = switch_commands_generator("sx1-0123meb-0045-a", "123", "45")
+        self.assertEqual(commands[:2], [
+            "hostname sx1-0123meb-0045-a",
+            "snmp-server location Bldg. 0123 Room 0045",
+        ])
+        self.assertEqual(len(commands), 3)
+
+    def test_banner_matches_line_by_line_send(self):
+        # netmiko's normalize_cmd strips each command's trailing whitespace and adds one newline
+        def normalize_cmd(command):
+            return command.rstrip() + "\n"
+
+        old_lines = ["banner login ^", "\n", "sx1-0123meb-0045-a", *BANNER_BODY]
+        old_sent = "".join(normalize_cmd(line) for line in old_lines)
+        banner = switch_commands_generator("sx1-0123meb-0045-a", "123", "45")[2]
+        self.assertEqual(normalize_cmd(banner), old_sent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from uit_name_guesser import guess_name
+
+BUILDING_CODES = {12: "ab", 45: "mb", 123: "abc", 1234: "xyz"}
+
+# Each name with the output the segment-by-segment parser gave before the whole-name pattern was added
+OLD_OUTPUT = {
+    "sx1-0123abc-0100-a.net.utah.edu": "sx 1 123 abc 0100 a 10.0.0.1",
+    "sx1-0123-abc-0100-a.net.utah.edu": "sx 1 123 abc 0100 a 10.0.0.1",
+    "sx2-1234xyz-0100-b02-a": "sx 2 1234 xyz 0100-b02 a 10.0.0.1",
+    "dx1-12345abc-0045-a": "dx 1 1234 5abc 0045 a 10.0.0.1",
+    "sx1-123_abc-0100-a": "sx 1 123 abc 0100 a 10.0.0.1",
+    "sx10-0123abc-0100-a": "sx1 0 123 abc 0100 a 10.0.0.1",
+    "sx1-0045mb-ljb-101-b": "sx 1 45 mb ljb-101 b 10.0.0.1",
+    "sx1-0123abc-1b-2-c": "sx 1 123 abc 1b-2 c 10.0.0.1",
+    "sx1-0123-0100-a": "sx 1 123 0100  a 10.0.0.1",
+    "sx1-0123abc-a": "sx 1 123 abc  a 10.0.0.1",
+    "sx1-12ab-0100-a": "sx 1 12 ab 0100 a 10.0.0.1",
+    "sx1-ab12-0100-a": "sx 1 12 ab 0100 a 10.0.0.1",
+    "sx1-1a2b-0100-a": "sx 1 12 ab 0100 a 10.0.0.1",
+}
+
+
+class TestGuessName(unittest.TestCase):
+
+    def test_matches_old_output(self):
+        for fqdn, expected in OLD_OUTPUT.items():
+            with self.subTest(fqdn=fqdn):
+                self.assertEqual(guess_name("10.0.0.1", fqdn, BUILDING_CODES), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
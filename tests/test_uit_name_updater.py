@@ -0,0 +1,161 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest.mock import MagicMock, patch
+import uit_device_types
+import uit_name_updater
+from uit_name_updater import (
+    dns_changer_wapi,
+    get_args,
+    get_connection,
+    get_host_record_ref,
+    get_switch_name,
+    read_batch_file,
+)
+
+CSV_HEADER = "function_descriptor,count,building_number,building_short_name,room_number,distribution_node,switch_ip\n"
+
+IOS_SHOW_VERSION = """\
+Cisco IOS XE Software, Version 17.03.04a
+Cisco IOS Software [Amsterdam], Catalyst L3 Switch Software (CAT9K_IOSXE), Version 17.3.4a, RELEASE SOFTWARE (fc3)
+ROM: IOS-XE ROMMON
+sx1-0123abc-0100-a uptime is 1 year, 12 weeks, 3 days, 4 hours, 5 minutes
+Uptime for this control processor is 1 year, 12 weeks, 3 days, 4 hours, 7 minutes
+System returned to ROM by Reload Command
+"""
+
+NXOS_SHOW_VERSION = """\
+Cisco Nexus Operating System (NX-OS) Software
+Software
+  BIOS: version 07.69
+  NXOS: version 9.3(8)
+Hardware
+  cisco Nexus9000 C93180YC-FX Chassis
+  Device name: dx1-0123abc-0100-a
+  bootflash:   53298520 kB
+Kernel uptime is 125 day(s), 3 hour(s), 14 minute(s), 7 second(s)
+"""
+
+
+class TestGetSwitchName(unittest.TestCase):
+
+    def _connection(self, device_type, output):
+        connection = MagicMock()
+        connection.device_type = device_type
+        connection.send_command.return_value = output
+        return connection
+
+    def test_ios(self):
+        connection = self._connection("cisco_xe", IOS_SHOW_VERSION)
+        self.assertEqual(get_switch_name(connection), "sx1-0123abc-0100-a")
+
+    def test_nxos(self):
+        connection = self._connection("cisco_nxos", NXOS_SHOW_VERSION)
+        self.assertEqual(get_switch_name(connection), "dx1-0123abc-0100-a")
+
+    def test_kernel_uptime_is_not_a_hostname(self):
+        # An NX-OS switch detected as another type must not be named "Kernel"
+        connection = self._connection("cisco_ios", NXOS_SHOW_VERSION)
+        connection.send_command.side_effect = [NXOS_SHOW_VERSION, {"version": {"hostname": "dx1-0123abc-0100-a"}}]
+        self.assertEqual(get_switch_name(connection), "dx1-0123abc-0100-a")
+
+
+class TestGetConnection(unittest.TestCase):
+
+    def setUp(self):
+        uit_device_types._device_type_cache.clear()
+        uit_name_updater._connections.clear()
+        self.addCleanup(uit_device_types._device_type_cache.clear)
+        self.addCleanup(uit_name_updater._connections.clear)
+
+    def test_stale_cached_device_type_is_detected_again(self):
+        uit_device_types._device_type_cache["10.0.0.1"] = "cisco_ios"
+        connection = MagicMock()
+
+        def detect(connection_dictionary):
+            # The stale type must be gone before detecting, so the detected type replaces it
+            self.assertIsNone(uit_device_types.get_cached_device_type("10.0.0.1"))
+            return "cisco_nxos"
+
+        with patch("netmiko.ConnectHandler", side_effect=[ValueError("wrong device type"), connection]) as handler, \
+                patch.object(uit_name_updater, "get_device_type", side_effect=detect):
+            self.assertIs(get_connection("10.0.0.1"), connection)
+        self.assertEqual([call.kwargs["device_type"] for call in handler.call_args_list], ["cisco_ios", "cisco_nxos"])
+
+
+class TestDnsChangerWapi(unittest.TestCase):
+
+    ref = "record:host/ZG5zLmhvc3QkLl9kZWZhdWx0:sx1-old.net.utah.edu/Internal"
+
+    def test_host_record_ref_from_lookup(self):
+        results = {"objects": ["record:a/ZG5zLmJpbmRfYSQ:sx1-old.net.utah.edu/Internal", self.ref]}
+        self.assertEqual(get_host_record_ref(results), self.ref)
+
+    def test_aliases_are_merged(self):
+        record = {
+            "_ref": self.ref,
+            "name": "sx1-old.net.utah.edu",
+            "aliases": ["keep.net.utah.edu", "dx1-demark.net.utah.edu"],
+        }
+        with patch.object(uit_name_updater, "infoblox_get_host", return_value=record) as get_host, \
+                patch.object(uit_name_updater, "infoblox_update_host") as update_host:
+            dns_changer_wapi(self.ref, "sx1-new", "sx1-old.net.utah.edu", ["dx1-demark", "dx1-other"])
+        get_host.assert_called_once_with(self.ref)
+        # The whole list is replaced, so the existing aliases must be kept and nothing added twice
+        update_host.assert_called_once_with(
+            self.ref,
+            "sx1-new.net.utah.edu",
+            [
+                "keep.net.utah.edu",
+                "dx1-demark.net.utah.edu",
+                "sx1-old.net.utah.edu",
+                "dx1-other.net.utah.edu",
+            ],
+        )
+
+
+class TestArguments(unittest.TestCase):
+
+    def _parse_error(self, *argv):
+        with patch("sys.argv", ["uit_name_updater.py", *argv]), redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                get_args()
+
+    def test_workers_must_be_positive(self):
+        self._parse_error("--batch", "switches.csv", "--workers", "0")
+
+    def test_switch_arguments_rejected_with_batch(self):
+        self._parse_error("--batch", "switches.csv", "sx", "1", "123", "abc", "100", "a", "10.0.0.1")
+
+
+class TestReadBatchFile(unittest.TestCase):
+
+    def _write_csv(self, *rows):
+        file = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        self.addCleanup(os.remove, file.name)
+        with file:
+            file.write(CSV_HEADER + "".join(f"{row}\n" for row in rows))
+        return file.name
+
+    def _read_error(self, path):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            read_batch_file(path)
+
+    def test_numbers_are_padded(self):
+        switches = read_batch_file(self._write_csv("sx, 1 ,123,abc,45,a,10.0.0.1"))
+        self.assertEqual(len(switches), 1)
+        self.assertEqual(switches[0].count, "1")
+        self.assertEqual(switches[0].building_number, "0123")
+        self.assertEqual(switches[0].room_number, "0045")
+
+    def test_missing_column(self):
+        self._read_error(self._write_csv("sx,1,123,abc,45,a"))
+
+    def test_invalid_ip(self):
+        self._read_error(self._write_csv("sx,1,123,abc,45,a,10.0.0.256"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,6 +18,7 @@ from netmiko import ConnectHandler, SSHDetect, BaseConnection
 from netmiko import NetmikoAuthenticationException, NetmikoTimeoutException
 
 # Local libraries
+from uit_name_common import BANNER_BODY
 
 
 # Standard exit codes
@@ -86,21 +87,7 @@ def switch_commands_generator(switch_name: str) -> list:
         "banner login ^",
         "\n",
         switch_name,
-        "\n",
-        "University of Utah Network:  All use of this device must comply",
-        "with the University of Utah policies and procedures.  Any use of",
-        "this device, whether deliberate or not will be held legally",
-        "responsible.  See University of Utah Information Security",
-        "Policy (4-004) for details.",
-        "\n",
-        "Problems within the University of Utah's network should be reported",
-        "by calling the Campus Helpdesk at 581-4000, or via e-mail at",
-        "helpdesk@utah.edu",
-        "\n",
-        "DO NOT LOGIN",
-        "if you are not authorized by NetCom at the University of Utah.",
-        "\n\n",
-        "^",
+        *BANNER_BODY,
     ]
 
 
@@ -10,6 +10,7 @@ Usage:
 
 Options:
     --debug     Enable debug mode
+    --refresh   Ignore the cached building list and fetch a new one
     building_number(s)   The building number(s) to lookup
 
 Example:
@@ -19,7 +20,9 @@ Example:
 # Standard libraries
 import argparse
 import logging
+import time
 from io import StringIO
+from pathlib import Path
 from sys import exit
 
 # Third-party libraries
@@ -49,6 +52,10 @@ logging.basicConfig(
 )
 log: logging.Logger = logging.getLogger("rich")
 
+# The building list rarely changes, so it is cached on disk between runs
+CACHE_DIR = Path.home() / ".cache" / "uit"
+CACHE_MAX_AGE = 24 * 60 * 60  # Seconds before a cached building list is fetched again
+
 # TODO: Add argument for All buildings, Active buildings, or Inactive buildings with choices and Active as default
 def get_args() -> argparse.Namespace:
     """
@@ -77,6 +84,13 @@ def get_args() -> argparse.Namespace:
         type=str
     )
 
+    parser.add_argument(
+        "-r",
+        "--refresh",
+        action="store_true",
+        help="Fetch the building list even if a cached copy is recent enough."
+    )
+
     parser.add_argument(
         "building_number",
         type=int,
@@ -111,6 +125,32 @@ def get_table_data(status: str = "active") -> pd.DataFrame:
     return df
 
 
+def get_cached_table_data(status: str = "active", max_age: float = CACHE_MAX_AGE) -> pd.DataFrame:
+    """
+    Returns the table data from the on-disk cache, fetching and caching it if the cache is missing or too old.
+
+    Args:
+        status (str): The status of the buildings to get, one of 'active', 'inactive', or 'all'.
+        max_age (float): The age in seconds after which the cached table data is fetched again.
+
+    Returns:
+        pd.DataFrame: The table data as a pandas DataFrame.
+    """
+    cache_file = CACHE_DIR / f"buildings_{status}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime < max_age:
+            # dtype and convert_dates are off so codes like "0123" stay strings, as they were in the fetched table
+            df = pd.read_json(cache_file, orient="split", dtype=False, convert_dates=False)
+            return df.set_index("Building Number", drop=False)
+    except Exception as e:  # Any unreadable cache is treated as missing and fetched again
+        log.debug("Building list cache not used: %s", e)
+
+    df = get_table_data(status=status)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    df.to_json(cache_file, orient="split", index=False)
+    return df
+
+
 def build_rich_table(df: pd.DataFrame, building_numbers: list[int]) -> Table:
     """
     Converts a pandas DataFrame to a rich Table.
@@ -155,7 +195,7 @@ def main() -> None:
 
     log.debug(f"ARGS: {ARGS}")
 
-    table_data = get_table_data(status=ARGS.status)
+    table_data = get_cached_table_data(status=ARGS.status, max_age=0 if ARGS.refresh else CACHE_MAX_AGE)
     log.debug(f"Table data (First 5 rows): {table_data.head()}")
 
     console.print(build_rich_table(table_data, ARGS.building_number))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A cache of the netmiko device type of each switch, shared by the scripts that connect to switches.
+
+Autodetecting a device type opens its own SSH session to the switch, the cache lets a switch that has been seen
+before skip straight to the real connection. Callers that can recover from a wrong type can also guess an unseen
+switch's type from the other switches in its /24. The cache is saved to a JSON file so it carries over between runs,
+only detected device types are saved, never guesses. A cached type that stops working can be dropped with
+forget_device_type so the switch is detected again.
+"""
+
+# Standard libraries
+import json
+from pathlib import Path
+from threading import Lock
+
+# Third-party libraries
+
+# Local libraries
+
+
+DEVICE_TYPE_CACHE_FILE = Path.home() / ".uit_device_types.json"
+_device_type_cache: dict[str, str] = {}
+_device_type_cache_lock = Lock()
+
+
+def load_device_type_cache() -> None:
+    """
+    Loads the saved device types into the device type cache.
+
+    Returns:
+        None
+    """
+    try:
+        with open(DEVICE_TYPE_CACHE_FILE) as file:  # Open the cache file
+            saved_device_types = json.load(file)  # Read the saved device types
+    except (FileNotFoundError, json.JSONDecodeError):  # If there is no cache file yet or it is unreadable
+        return  # Start with an empty cache
+
+    with _device_type_cache_lock:
+        _device_type_cache.update(saved_device_types)  # Add the saved device types to the cache
+
+
+def save_device_type_cache() -> None:
+    """
+    Saves the device type cache so the next run can skip autodetecting known switches.
+
+    Returns:
+        None
+    """
+    with _device_type_cache_lock:
+        device_types = dict(_device_type_cache)  # Copy the cache so it isn't changed while writing
+
+    with open(DEVICE_TYPE_CACHE_FILE, "w") as file:  # Open the cache file
+        json.dump(device_types, file, indent=4)  # Write the device types to the cache file
+
+
+def guess_device_type(ip: str) -> str | None:
+    """
+    Guesses the device type of a switch from the cached switches in the same /24.
+
+    The guess isn't added to the cache, callers should fall back to get_device_type if connecting with it fails.
+
+    Args:
+        ip (str): The IPv4 address of the switch.
+
+    Returns:
+        str | None: The device type shared by every cached switch in the /24, or None if fewer than two switches
+        in the /24 are cached or they differ.
+    """
+    prefix = ip.rpartition(".")[0] + "."  # The first three octets of the address
+    if prefix == ".":  # Not an IPv4 address
+        return None
+
+    with _device_type_cache_lock:
+        neighbors = [device_type for host, device_type in _device_type_cache.items() if host.startswith(prefix)]
+
+    if len(neighbors) < 2 or len(set(neighbors)) != 1:  # A single switch or a mixed subnet isn't enough to go on
+        return None
+    return neighbors[0]
+
+
+def get_cached_device_type(host: str) -> str | None:
+    """
+    Gets the device type of a switch from the cache without detecting it.
+
+    Args:
+        host (str): The IP address of the switch.
+
+    Returns:
+        str | None: The cached device type, or None if the switch hasn't been detected before.
+    """
+    with _device_type_cache_lock:
+        return _device_type_cache.get(host)
+
+
+def forget_device_type(host: str) -> None:
+    """
+    Removes a switch from the cache, for when its cached device type no longer works (e.g. the hardware was replaced).
+
+    Args:
+        host (str): The IP address of the switch.
+
+    Returns:
+        None
+    """
+    with _device_type_cache_lock:
+        _device_type_cache.pop(host, None)
+
+
+def get_device_type(connection_dictionary: dict) -> str:
+    """
+    Gets the netmiko device type of a switch, autodetecting it only if it isn't already in the cache.
+
+    Args:
+        connection_dictionary (dict): The netmiko connection dictionary for the switch, "host" is used as the cache key.
+
+    Returns:
+        str: The device type of the switch.
+
+    Raises:
+        NetmikoAuthenticationException: If the switch rejects the credentials while autodetecting.
+        NetmikoTimeoutException: If the switch can't be reached while autodetecting.
+    """
+    host = connection_dictionary["host"]
+
+    with _device_type_cache_lock:
+        device_type = _device_type_cache.get(host)  # Check if the device type is already known
+
+    if device_type is None:  # If the device type is not known, autodetect it
+        from netmiko import SSHDetect  # Only needed when a switch hasn't been seen before
+
+        guesser = SSHDetect(**{**connection_dictionary, "device_type": "autodetect"})
+        device_type = guesser.autodetect()  # Autodetect the device type
+
+        with _device_type_cache_lock:
+            _device_type_cache[host] = device_type  # Remember the device type for next time
+
+    return device_type
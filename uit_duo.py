@@ -5,17 +5,30 @@ This module provides a class for performing login to the University of Utah plat
 """
 
 # Standard libraries
+from contextlib import contextmanager
+from functools import lru_cache
+import html
+from http.cookiejar import LoadError, LWPCookieJar
 import logging
+import random
+import re
 from sys import exit
 import urllib.parse
 from getpass import getpass
 from pathlib import Path
-import pickle
+import time
+from typing import TYPE_CHECKING
 
 # Third-party libraries
 from rich.logging import RichHandler
-from bs4 import BeautifulSoup
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# lxml is imported where it's used so runs that don't parse a page skip the import cost
+if TYPE_CHECKING:
+    from lxml import html as lxml_html
 
 # Local libraries
 
@@ -36,11 +49,73 @@ logging.basicConfig(
 )
 log: logging.Logger = logging.getLogger("rich")
 
+# Fallback for logout links written with other quoting or spacing than href="logout"
+_LOGOUT_RE = re.compile(rb"""href\s*=\s*["']?logout["'\s>]""", re.IGNORECASE)
+
+# Pattern for pulling name/value attributes out of an <input> tag without building a DOM
+_INPUT_ATTRIBUTE_RE = re.compile(
+    r"""(?<![\w-])(name|value)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE
+)
+
+# Circuit breaker settings for the Duo API, consecutive failures before opening and seconds to stay open
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN = 30
+_BREAKER: dict[str, dict] = {}
+
+# Duo push statuses that end the login, mapped to the error to report
+_PUSH_FAILURES = {
+    "deny": "Authentication Push denied.",
+    "timeout": "Authentication Push timed out.",
+}
+
 
 class LoginError(Exception):
     pass
 
 
+@contextmanager
+def _circuit_breaker(url: str, ignore: tuple[type[requests.RequestException], ...] = ()):
+    """
+    Guards a request to the URL's host with a circuit breaker.
+
+    After `_BREAKER_THRESHOLD` consecutive failures the circuit opens and requests to the host fail
+    immediately for `_BREAKER_COOLDOWN` seconds. After that one request is let through (half-open),
+    closing the circuit if it succeeds and reopening it if it fails.
+
+    Args:
+        url (str): The URL being requested.
+        ignore (tuple[type[requests.RequestException], ...]): Errors the caller handles itself, these are re-raised
+            without counting as a failure or a success.
+
+    Raises:
+        LoginError: If the circuit for the host is open.
+    """
+    host = urllib.parse.urlsplit(url).hostname
+    breaker = _BREAKER.setdefault(host, {"state": "closed", "fails": 0, "opened_at": 0.0})
+
+    if breaker["state"] == "open":
+        if time.monotonic() - breaker["opened_at"] < _BREAKER_COOLDOWN:
+            raise LoginError(f"Circuit open for {host}, not sending request.")
+        breaker["state"] = "half-open"
+
+    try:
+        yield
+    except requests.RequestException as e:
+        if isinstance(e, ignore):
+            raise
+        # A client error means the host is up, only connection problems and server errors count
+        if e.response is None or e.response.status_code >= 500:
+            breaker["fails"] += 1
+            if breaker["state"] == "half-open" or breaker["fails"] >= _BREAKER_THRESHOLD:
+                log.debug(f"Opening circuit for {host} after {breaker['fails']} failure(s).")
+                breaker.update(state="open", opened_at=time.monotonic())
+            raise
+        breaker.update(state="closed", fails=0)
+        raise
+    else:
+        breaker.update(state="closed", fails=0)
+
+
 class Duo:
     """
     Represents a Duo authentication handler for the University of Utah platform.
@@ -54,8 +129,11 @@ class Duo:
         _password (str): The password of the user.
         _prompt_check_times (int): The number of times to check Duo authentication status.
         _login_url (str): The URL for the login page.
+        _login_data (dict[str, str]): The form data posted to the login page.
         _duo_api_url (str): The URL for the Duo API.
         _test_url (str): The URL for testing authentication.
+        _timeout (tuple[float, float]): The (connect, read) timeout in seconds for each request.
+        _status_timeout (tuple[float, float]): The (connect, read) timeout in seconds for Duo status polls.
         cookie_jar (Path): The file path for storing session cookies.
 
     Methods:
@@ -85,56 +163,73 @@ class Duo:
         self.session = requests.Session()
         self._username = uNID
         self._password = password
-        self._prompt_check_times = 3
+        self._prompt_check_times = 6
         self._login_url = "https://go.utah.edu/cas/login"
         self._duo_api_url = "https://api-aba4bf07.duosecurity.com/frame/v4"
+        self._timeout = (3.05, 15)  # Fail fast on a stalled connection instead of hanging the login
+        self._status_timeout = (3.05, 30)  # Duo holds status polls open until the push changes state
         self.cookie_jar = Path.home().joinpath(".uit_duo_cookies")
+        # Only the execution token changes between logins, login fills it in
+        self._login_data = {"username": uNID, "password": password, "_eventId": "submit"}
 
         self.session.headers.update(
             {"User-Agent": f"{uNID}-python-requests", "UNID": uNID}
         )
 
+        # The login flow only talks to go.utah.edu and the Duo API, so keep a small pool of
+        # warm connections to each and retry transient gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+
     def _store_cookies(self) -> None:
         """
         Stores the session cookies in a file.
 
-        This method serializes the session cookies and saves them to a file using pickle.
+        This method saves the session cookies to a file in the libwww-perl (LWP) Set-Cookie3 text format.
         The file path is specified by the `cookie_jar` attribute of the class.
         """
-        with open(self.cookie_jar, "wb") as file:
-            pickle.dump(self.session.cookies, file)
+        jar = LWPCookieJar(self.cookie_jar)
+        for cookie in self.session.cookies:
+            jar.set_cookie(cookie)
+        jar.save(ignore_discard=True)
 
     def _load_cookies(self) -> None:
         """
         Loads the session cookies from a file.
 
-        This method loads the session cookies from a file using pickle.
+        This method loads the session cookies from an LWP Set-Cookie3 text file.
         The file path is specified by the `cookie_jar` attribute of the class.
         """
+        jar = LWPCookieJar(self.cookie_jar)
         try:
-            with open(self.cookie_jar, "rb") as file:
-                self.session.cookies.update(pickle.load(file))
+            jar.load(ignore_discard=True)
         except FileNotFoundError:
             # If the file is not found, do nothing
             log.debug("Cookies file not found.")
-            pass
-        except EOFError:
-            # If the file is empty, do nothing
-            log.debug("Cookies file is empty.")
-            pass
-
-    def _test_authentication(self) -> bool:
+            return
+        except (LoadError, UnicodeDecodeError):
+            # If the file is empty or in the old pickle format, do nothing (it will be overwritten on the next login)
+            log.debug("Cookies file is empty or unreadable.")
+            return
+        self.session.cookies.update(jar)
+
+    def _test_authentication(self, response: requests.Response) -> bool:
         """
         Tests the current session authentication status.
-        """
-        response: requests.Response = self.session.get(self._login_url)
-        response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        if soup.find("a", attrs={"href": "logout"}):
-            return True
-        else:
-            return False
+        Args:
+            response (requests.Response): The response from requesting the login page with the current session.
+
+        Returns:
+            bool: True if the login page shows the session as already logged in, False otherwise.
+        """
+        # Only the presence of the logout link matters, so search the raw bytes instead of parsing the page
+        content = response.content
+        return b'href="logout"' in content or _LOGOUT_RE.search(content) is not None
 
 
     def login(self) -> requests.Session:
@@ -160,38 +255,35 @@ class Duo:
 
         # Test authentication
         log.debug("Testing authentication...")
-        if self._test_authentication():
+        response: requests.Response = self.session.get(self._login_url, timeout=self._timeout)
+        response.raise_for_status()
+
+        if self._test_authentication(response):
             log.debug("Authentication successful.")
             return self.session
         else:
             log.debug("Authentication failed. Starting login process...")
 
-        # Step 1: Get execution value
+        # Step 1: Get execution value from the login page that was just fetched
         log.debug("Getting execution value...")
-        response:requests.Response = self.session.get(self._login_url)
-        response.raise_for_status()
-
-        execution_value = get_form_args(response.text, "execution")
+        execution_value = get_form_args(response.content, "execution")
 
         # Step 2: Login with credentials and execution value
         log.debug("Logging in...")
-        login_data = {
-            "username": self._username,
-            "password": self._password,
-            "execution": execution_value,
-            "_eventId": "submit",
-        }
-        response = self.session.post(self._login_url, data=login_data, allow_redirects=True)
+        self._login_data["execution"] = execution_value
+        response = self.session.post(
+            self._login_url, data=self._login_data, allow_redirects=True, timeout=self._timeout
+        )
         response.raise_for_status()
 
         # Extract xsrf and auth_url from the response
         log.debug("Extracting xsrf and auth_url...")
-        xsrf = get_form_args(response.text, "_xsrf")
+        xsrf = get_form_args(response.content, "_xsrf")
         auth_url = response.url
 
         # Step 3: Get important cookies
         log.debug("Getting important cookies...")
-        response: requests.Response = self.session.post(auth_url, data={"_xsrf": xsrf})
+        response: requests.Response = self.session.post(auth_url, data={"_xsrf": xsrf}, timeout=self._timeout)
         response.raise_for_status()
 
         # Step 4: Handle Duo authentication (separate function)
@@ -221,6 +313,7 @@ class Duo:
             requests.exceptions.RequestException: If any network request fails.
             KeyError: If essential HTML form arguments are not found.
             ValueError: If query parameters are not found in parsed URLs.
+            LoginError: If the push is denied or times out, or the circuit for the Duo API is open.
         """
 
         # Step 5: Get sid from auth_url
@@ -233,12 +326,13 @@ class Duo:
             "post_auth_action": "OIDC_EXIT",
             "sid": sid,
         }
-        response = self.session.get(
-            self._duo_api_url + "/auth/prompt/data", params=duo_data
-        )
-        response.raise_for_status()
+        with _circuit_breaker(self._duo_api_url):
+            response = self.session.get(
+                self._duo_api_url + "/auth/prompt/data", params=duo_data, timeout=self._timeout
+            )
+            response.raise_for_status()
 
-        devices = response.json()["response"]["phones"]
+        devices = orjson.loads(response.content)["response"]["phones"]
         device = devices[0]  # Use the first device for simplicity
         # Maybe add a device selection prompt in the future and a way to store the preferred device
         log.debug(f"Using device: {device['name']}")
@@ -250,39 +344,49 @@ class Duo:
             "sid": sid,
             "factor": "Duo Push",
         }
-        response = self.session.post(self._duo_api_url + "/prompt", data=push_data)
-        print(f"Push notification sent to device: {device['name']}")
-        response.raise_for_status()
+        with _circuit_breaker(self._duo_api_url):
+            response = self.session.post(self._duo_api_url + "/prompt", data=push_data, timeout=self._timeout)
+            print(f"Push notification sent to device: {device['name']}")
+            response.raise_for_status()
 
-        txid = response.json()["response"]["txid"]
+        txid = orjson.loads(response.content)["response"]["txid"]
         log.debug(f"Duo authentication initiated, transaction ID: {txid}")
 
         # Step 8 & 9: Check Duo authentication status
         log.debug("Checking Duo authentication status...")
-        for _ in range(self._prompt_check_times):
-            status_data = {"txid": txid, "sid": sid}
-            response = self.session.post(
-                f"{self._duo_api_url}/status", data=status_data
-            )
-            response.raise_for_status()
+        # The status body only depends on txid and sid, so the request is prepared once and re-sent each poll.
+        # The tradeoff is that its Cookie header is fixed here, cookies set by a poll aren't sent on the next one,
+        # which is fine as the status endpoint only needs txid and sid
+        status_request = self.session.prepare_request(
+            requests.Request("POST", f"{self._duo_api_url}/status", data={"txid": txid, "sid": sid})
+        )
+        # Session.send skips the environment settings (e.g. REQUESTS_CA_BUNDLE) that Session.request applies
+        status_settings = self.session.merge_environment_settings(status_request.url, {}, None, None, None)
+        for attempt in range(self._prompt_check_times):
+            try:
+                # A stalled poll is retried below, only connection errors and server errors count toward the breaker
+                with _circuit_breaker(self._duo_api_url, ignore=(requests.ReadTimeout,)):
+                    response = self.session.send(status_request, timeout=self._status_timeout, **status_settings)
+                    response.raise_for_status()
+            except requests.Timeout:
+                # A stalled poll counts as one check, try again
+                log.debug("Push status check timed out.")
+                continue
+
+            status = orjson.loads(response.content)["response"]["status_code"]
+            if status in _PUSH_FAILURES:
+                # User denied the push or it timed out
+                log.error(_PUSH_FAILURES[status])
+                raise LoginError(_PUSH_FAILURES[status])
 
-            status = response.json()["response"]["status_code"]
             if status == "allow":
                 # User accepted the push
                 log.debug("Authentication Push accepted.")
                 break
 
-            if status == "deny":
-                # User denied the push
-                log.error("Authentication Push denied.")
-                raise LoginError("Authentication Push denied.")
-
-            if status == "timeout":
-                # Push timed out
-                log.error("Authentication Push timed out.")
-                raise LoginError("Authentication Push timed out.")
-
             log.debug(f"Push status: {status}")
+            if attempt < self._prompt_check_times - 1:
+                time.sleep(_poll_delay(attempt, response))
         else:  # If the loop completes without breaking
             raise LoginError(
                 f"Duo authentication failed, checked status {self._prompt_check_times} time(s)."
@@ -297,12 +401,35 @@ class Duo:
             "_xsrf": xsrf,
             "dampon_choice": "true",
         }
-        response = self.session.post(self._duo_api_url + "/oidc/exit", data=final_data)
-        response.raise_for_status()
+        # Only the cookies set along the way matter, so don't download the final page
+        with _circuit_breaker(self._duo_api_url):
+            response = self.session.post(
+                self._duo_api_url + "/oidc/exit", data=final_data, timeout=self._timeout, stream=True
+            )
+            response.close()
+            response.raise_for_status()
 
         # Authentication
 
 
+def _poll_delay(attempt: int, response: requests.Response) -> float:
+    """
+    Works out how long to wait before the next Duo status poll.
+
+    Args:
+        attempt (int): The zero based number of the poll that just finished.
+        response (requests.Response): The response from that poll.
+
+    Returns:
+        float: The server's Retry-After value in seconds if it sent one, otherwise an exponential
+        backoff with a little jitter. Either way it is capped at 2 seconds so the push isn't missed.
+    """
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), 2.0)
+    return min(2**attempt * 0.25 + random.random() * 0.1, 2.0)
+
+
 def extract_query_parameter(url: str, query_parameter: str) -> str:
     """
     Retrieves the query parameter from the given URL.
@@ -317,20 +444,126 @@ def extract_query_parameter(url: str, query_parameter: str) -> str:
     Raises:
         ValueError: If the query_parameter value is not found in the URL.
     """
-    param_value = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get(
-        query_parameter, [None]
-    )[0]
-    if param_value is None:
-        raise ValueError(f"{query_parameter} not found in the URL {url}")
-    return param_value
+    # Scan for the one key rather than building a dict of every parameter with parse_qs
+    query = urllib.parse.urlsplit(url).query
+    needle = query_parameter + "="
+    for part in query.split("&"):
+        # Blank values are skipped the same way parse_qs skips them
+        if part.startswith(needle) and len(part) > len(needle):
+            return urllib.parse.unquote_plus(part[len(needle):])
+    raise ValueError(f"{query_parameter} not found in the URL {url}")
+
+
+@lru_cache(maxsize=32)
+def _input_pattern(names: frozenset[str], binary: bool = False) -> re.Pattern:
+    """
+    Builds a pattern matching only the <input> tags that have one of the given names.
+
+    Args:
+        names (frozenset[str]): The input names to match.
+        binary (bool): Whether to build a bytes pattern instead of a str one.
+
+    Returns:
+        re.Pattern: The compiled pattern, cached per set of names.
+    """
+    alternatives = "|".join(re.escape(name) for name in sorted(names))
+    pattern = (
+        r"(?i:<input\b)"
+        rf"""(?=[^>]*(?<![\w-])(?i:name)\s*=\s*(?:"(?:{alternatives})"|'(?:{alternatives})'|(?:{alternatives})(?=[\s/>])))"""
+        r"[^>]*>"
+    )
+    return re.compile(pattern.encode() if binary else pattern)
+
+
+def _scan_inputs(html_doc: str | bytes, names: set[str]) -> dict[str, str | None]:
+    """
+    Scans the <input> tags of an HTML document for the given names in a single pass.
+
+    Args:
+        html_doc (str | bytes): The HTML document as a string, or the raw UTF-8 response body.
+        names (set[str]): The names of the inputs to find.
+
+    Returns:
+        dict[str, str | None]: The unescaped value of the first input found for each name, or None if that
+        input has no value. Names that weren't found are left out.
+    """
+    found = {}
+    # Only tags that look like they carry a wanted name are matched, the attribute parse confirms it
+    binary = isinstance(html_doc, bytes)
+    for tag in _input_pattern(frozenset(names), binary).finditer(html_doc):
+        # Only the matched tag is decoded, not the whole body
+        text = tag.group().decode("utf-8", "replace") if binary else tag.group()
+        attributes = {
+            key.lower(): double or single or bare
+            for key, double, single, bare in _INPUT_ATTRIBUTE_RE.findall(text)
+        }
+        name = attributes.get("name")
+        if name in names and name not in found:
+            found[name] = html.unescape(attributes["value"]) if "value" in attributes else None
+            if len(found) == len(names):
+                break
+    return found
+
+
+def _form_field(tree: "lxml_html.HtmlElement", name: str) -> str:
+    """
+    Retrieves the value attribute of the first element with the given name from a parsed document.
 
+    Args:
+        tree (lxml_html.HtmlElement): The parsed HTML document.
+        name (str): The name of the element to find.
 
-def get_form_args(html_doc: str, name) -> str:
+    Returns:
+        str: The value of the element.
+
+    Raises:
+        KeyError: If no element with the name, or no value on it, is found.
+    """
+    values = tree.xpath("(//*[@name=$name])[1]/@value", name=name)
+    if not values:
+        raise KeyError(f"{name} not found")
+    return str(values[0])
+
+
+def get_form_fields(html_doc: str | bytes, *names: str) -> dict[str, str]:
+    """
+    Retrieves the values of several named form fields from the given HTML document.
+
+    The document is scanned once for matching <input> tags and is only fully parsed
+    (at most once) if some of the fields can't be found that way. Passing the raw
+    response bytes skips decoding the whole body.
+
+    Args:
+        html_doc (str | bytes): The HTML document as a string, or the raw UTF-8 response body.
+        *names (str): The names of the fields to retrieve.
+
+    Returns:
+        dict[str, str]: The value of each field keyed by its name.
+
+    Raises:
+        KeyError: If any of the fields are not found.
+    """
+    fields = _scan_inputs(html_doc, set(names))
+    missing = [name for name in names if fields.get(name) is None]
+    if missing:
+        # Fall back to a full parse for markup the regex doesn't cover
+        from lxml import etree, html as lxml_html
+
+        try:
+            tree = lxml_html.fromstring(html_doc)
+        except etree.ParserError as e:  # An empty body has no fields either
+            raise KeyError(f"{missing[0]} not found") from e
+        for name in missing:
+            fields[name] = _form_field(tree, name)
+    return fields
+
+
+def get_form_args(html_doc: str | bytes, name) -> str:
     """
     Retrieves the value of an HTML attribute with the specified name from the given HTML document.
 
     Args:
-        html_doc (str): The HTML document as a string.
+        html_doc (str | bytes): The HTML document as a string, or the raw UTF-8 response body.
         name: The name of the attribute to retrieve.
 
     Returns:
@@ -339,10 +572,7 @@ def get_form_args(html_doc: str, name) -> str:
     Raises:
         KeyError: If the attribute with the specified name is not found.
     """
-    try:
-        return BeautifulSoup(html_doc, "html.parser").find(attrs={"name": name})["value"]
-    except (TypeError, KeyError):
-        raise KeyError(f"{name} not found")
+    return get_form_fields(html_doc, name)[name]
 
 
 def main() -> None:
@@ -27,9 +27,10 @@ Use the -h or --help argument to get help on how to use the script.
 """
 # Standard libraries
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from getpass import getpass
 from pathlib import Path
-from threading import Thread
 from shutil import get_terminal_size
 from sys import exit
 
@@ -37,11 +38,13 @@ from sys import exit
 import arrow
 from rich_argparse import RichHelpFormatter
 from netmiko import ConnectHandler
-from netmiko import SSHDetect
 from netmiko.exceptions import AuthenticationException
 from netmiko.exceptions import SSHException
 from netmiko.exceptions import ConnectionException
 
+# Local libraries
+from uit_device_types import get_device_type, load_device_type_cache, save_device_type_cache
+
 
 try:  # Try to import the username and password from the auth.py file
     from auth import SSH  # Import the SSH class from the auth.py file
@@ -97,10 +100,13 @@ def print_divider():
     print('-' * get_terminal_size()[0])  # Print a divider
 
 
+@lru_cache(maxsize=1)
 def key_interfaces_folder() -> str:
     """
     Creates a folder named "key_interfaces" in the user's documents directory.
 
+    The result is cached, so the folder is only looked up and created once per run.
+
     Returns:
         str: The path of the created folder.
     """
@@ -136,7 +142,7 @@ def get_ip_addresses() -> list[str]:
             else:  # If the user did not enter at least one IP address
                 print("Please enter at least one IP address.") # Print an error message
 
-    ip_addresses = list(set(ip_addresses))  # Remove duplicate entries from the list
+    ip_addresses = list(dict.fromkeys(ip_addresses))  # Remove duplicate entries from the list, keeping the given order
 
     return ip_addresses  # Return the list of IP addresses without duplicate entries
 
@@ -145,6 +151,9 @@ def gen_connection_dictionary(switch_ip: str, username: str, password: str, log_
     """
     Generates a connection dictionary for establishing a connection to the switch.
 
+    The device type is taken from the device type cache when the switch has been seen before,
+    otherwise it is autodetected with SSHDetect and added to the cache.
+
     Args:
         switch_ip (str): The IP address of the switch.
         username (str): The username for authentication.
@@ -164,9 +173,7 @@ def gen_connection_dictionary(switch_ip: str, username: str, password: str, log_
         "device_type": "autodetect",
     }
 
-    guesser = SSHDetect(**connection_dictionary)  # Instantiate the SSHDetect class
-
-    connection_dictionary['device_type'] = guesser.autodetect()  # Set the device type in the connection dictionary
+    connection_dictionary['device_type'] = get_device_type(connection_dictionary)  # Set the device type in the connection dictionary
 
     return connection_dictionary  # Return the connection dictionary
 
@@ -257,23 +264,22 @@ def main():
     Returns:
         None
     """
-    chunk_size = 50 # Set the chunk size
+    max_workers = 50  # Set the number of switches to check at the same time
     ip_addresses = get_ip_addresses()  # Get the IP addresses
-    threads = []  # Initialize the threads list
+    load_device_type_cache()  # Load the device types found in previous runs
 
     print_divider()
     print(f"Starting to check trunk interfaces for {len(ip_addresses)} switches.")
     print_divider()
 
-    for i in range(0, len(ip_addresses), chunk_size):  # Iterate through the IP addresses
-        chunk = ip_addresses[i:i + chunk_size]  # Get a chunk of IP addresses
-        for ip_address in chunk:  # Iterate through the chunk of IP addresses
-                thread = Thread(target=check_trunk_interfaces, args=(ip_address,))  # Create a thread for the IP address
-                threads.append(thread)  # Add the thread to the threads list
-                thread.start()  # Start the thread
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:  # A new switch starts as soon as a worker is free
+        futures = {executor.submit(check_trunk_interfaces, ip_address): ip_address for ip_address in ip_addresses}
+
+        for future in as_completed(futures):  # Iterate through the switches as they finish
+            if future.exception():  # If the check failed in a way it didn't handle itself
+                print(f"[!!!] An error occurred for {futures[future]} - {future.exception()}.")
 
-        for thread in threads:  # Iterate through the threads
-            thread.join()  # Wait for the thread to finish
+    save_device_type_cache()  # Save the device types for the next run
 
     print_divider()
     print(f"Finished checking trunk interfaces for {len(ip_addresses)} switches.")
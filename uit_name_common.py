@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by the switch naming scripts for validating input and building switch names and commands.
+"""
+
+# Standard libraries
+import argparse
+from functools import cache, lru_cache
+import logging
+from socket import inet_pton, AF_INET
+
+# Third-party libraries
+
+# Local libraries
+
+
+log: logging.Logger = logging.getLogger("rich")
+
+
+def validate_ip_address(ip: str) -> str:
+    """
+    Validates the given IP address, switch management addresses are always IPv4.
+
+    Args:
+        ip (str): The IP address to validate.
+
+    Returns:
+        str: The validated IP address.
+
+    Raises:
+        argparse.ArgumentTypeError: If the IP address is not a valid IPv4 address.
+    """
+    # inet_pton checks the address in C without building an ipaddress object
+    try:
+        inet_pton(AF_INET, ip)
+    except OSError:
+        raise argparse.ArgumentTypeError("Invalid IPv4 address")
+    return ip
+
+
+# Room "numbers" that are still recorded by name rather than number, these are left unpadded
+_UNPADDED_ROOMS = frozenset(("mdf", "lab"))
+
+
+def pad_number(number: str) -> str:
+    """
+    Pads a building or room number with 0's to 4 digits.
+
+    Args:
+        number (str): The building or room number, already padded numbers are returned unchanged.
+
+    Returns:
+        str: The padded number, or the original value if it is a room name such as 'mdf' or 'lab'.
+    """
+    if len(number) >= 4 or number in _UNPADDED_ROOMS:
+        return number
+    return number.zfill(4)
+
+
+# Translation table that deletes whitespace from a building short name
+_STRIP_WS = str.maketrans("", "", " \t\r\n")
+
+
+@lru_cache(maxsize=512)
+def _norm_short(building_short_name: str) -> str:
+    """
+    Normalizes a building short name for use in a switch name.
+
+    Args:
+        building_short_name (str): The short name of the building.
+
+    Returns:
+        str: The short name without whitespace, with a leading hyphen if it starts with a number.
+    """
+    building_short_name = building_short_name.translate(_STRIP_WS)  # Remove whitespace from the building short name
+
+    if building_short_name[:1].isnumeric():  # If the building short name starts with a number
+        return f"-{building_short_name}"  # Add a hyphen to the beginning of the building short name
+    return building_short_name
+
+
+@cache
+def name_generator(function_descriptor: str, count: str, building_number: str,
+                   building_short_name: str, room_number: str, distribution_node: str) -> str:
+    """
+    Generates a name for a network device based on the given parameters.
+
+    Args:
+        function_descriptor (str): The function descriptor for the device.
+        count (str): The count of the device.
+        building_number (str): The building number of the device. (Padded with 0's to 4 digits)
+        building_short_name (str): The short name of the building.
+        room_number (str): The room number of the device. (Padded with 0's to 4 digits)
+        distribution_node (str): The distribution node of the device.
+
+    Returns:
+        str: The generated name for the network device.
+    """
+    # Room numbers listed as 'mdf' or 'lab' rather than a proper number are left as is by pad_number.
+    # If proper room number is known, it should be used instead of 'mdf'.
+    switch_name = f"{function_descriptor}{count}-{pad_number(building_number)}{_norm_short(building_short_name)}-{pad_number(room_number)}-{distribution_node}".lower()
+
+    log.debug("Generated Switch Name: %s", switch_name)
+
+    return switch_name
+
+
+@cache
+def location_generator(building_number: str, room_number: str) -> str:
+    """
+    Generates a location string for a network device based on the given building and room numbers.
+
+    Args:
+        building_number (str): The building number of the device. (Padded with 0's to 4 digits)
+        room_number (str): The room number of the device. (Padded with 0's to 4 digits)
+
+    Returns:
+        str: The generated location string for the network device.
+    """
+    return f"Bldg. {pad_number(building_number)} Room {pad_number(room_number)}"
+
+
+# The part of the login banner after the switch name, it is the same for every switch
+BANNER_BODY = (
+    "\n",
+    "University of Utah Network:  All use of this device must comply",
+    "with the University of Utah policies and procedures.  Any use of",
+    "this device, whether deliberate or not will be held legally",
+    "responsible.  See University of Utah Information Security",
+    "Policy (4-004) for details.",
+    "\n",
+    "Problems within the University of Utah's network should be reported",
+    "by calling the Campus Helpdesk at 581-4000, or via e-mail at",
+    "helpdesk@utah.edu",
+    "\n",
+    "DO NOT LOGIN",
+    "if you are not authorized by NetCom at the University of Utah.",
+    "\n\n",
+    "^",
+)
+# netmiko strips trailing whitespace from each command before sending it, so a "\n" element was one blank line
+_BANNER_BODY_TEXT = "\n".join(line.rstrip() for line in BANNER_BODY)
+
+
+def switch_commands_generator(switch_name: str, building_number: str, room_number: str) -> list:
+    """
+    Generate a list of commands for configuring a switch.
+
+    The login banner is a single multi-line command so it is sent to the switch in one write rather than
+    one line at a time.
+
+    :param switch_name: The name of the switch.
+    :param building_number: The number of the building where the switch is located.
+    :param room_number: The number of the room where the switch is located.
+    :return: A list of commands for configuring the switch.
+    """
+    return [
+        f"hostname {switch_name}",
+        f"snmp-server location {location_generator(building_number, room_number)}",
+        f"banner login ^\n\n{switch_name}\n{_BANNER_BODY_TEXT}",
+    ]
@@ -6,16 +6,18 @@
 
 # Standard libraries
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import re
+import string
 from socket import getfqdn
-from sys import exit
+from sys import exit, stdin
 
 # Third-party libraries
 from rich.logging import RichHandler
-from SwitchInfo import Switch
 
 # Local libraries
-from uit_building_lookup import get_table_data
+from uit_building_lookup import get_cached_table_data
 
 # Standard exit codes
 EXIT_SUCCESS = 0  # No errors
@@ -33,62 +35,137 @@ logging.basicConfig(
 )
 log: logging.Logger = logging.getLogger("rich")
 
+# Matches a whole switch name like "sx1-0123abc-0100-a" (or "sx1-0123-abc-0100-a"), capturing the
+# function descriptor, number, building number, building code, room number and node. An attached building number
+# is at most 4 digits, so "12345abc" is building 1234 with code "5abc", and 3 digits only when a 4th digit doesn't follow
+_NAME_RE = re.compile(r"([^-]*)([^-])-(\d+(?=-)|\d{4}(?!-)|\d{3}(?![\d-]))-?([^-]+)-(.+)-([^-]+)")
+
+# Splits a name segment like "0123abc" into its leading 3 or 4 digit building number and the building code after it
+_BUILDING_RE = re.compile(r"(\d{3,4})(.+)")
+_DROP_DIGITS = str.maketrans("", "", string.digits)
+
+
+# The parser is built once at import time, get_args only has to parse
+_PARSER = argparse.ArgumentParser(
+    description="A script for guessing the name of a switch based on its IP address."
+)
+_PARSER.add_argument(
+    "ip",
+    type=str,
+    nargs="*",
+    help="The IP address(es) of the switch(es). Required unless --batch is used."
+)
+_PARSER.add_argument(
+    "--batch",
+    type=str,
+    nargs="?",
+    const="-",
+    help="Read the IP addresses, whitespace separated, from FILE instead of the arguments. "
+    "Reads stdin if FILE is - or left out.",
+    metavar="FILE"
+)
+
 
 def get_args() -> argparse.Namespace:
     """"""
-    parser = argparse.ArgumentParser(
-        description="A script for guessing the name of a switch based on its IP address."
-    )
-    parser.add_argument("ip", type=str, help="The IP address of the switch.")
-    return parser.parse_args()
+    args = _PARSER.parse_args()
+    if args.batch is None and not args.ip:
+        _PARSER.error("the following arguments are required: ip (or --batch)")
+    if args.batch is not None and args.ip:
+        _PARSER.error("ip can't be used with --batch")
+    return args
 
 
 def main() -> None:
     """
     #TODO: Add description
     """
-    switch = Switch(get_args().ip)
-    if switch.name.rack_number:
-        print(f"{switch.name.function_descriptor} {switch.name.number} {switch.name.building_number} {switch.name.building_code} {switch.name.room_number}-{switch.name.rack_number} {switch.name.node} {switch.ip}")
-    else:
-        print(f"{switch.name.function_descriptor} {switch.name.number} {switch.name.building_number} {switch.name.building_code} {switch.name.room_number} {switch.name.node} {switch.ip}")
+    from SwitchInfo import Switch  # Only the single switch lookup needs it
 
+    for ip in get_ip_addresses():
+        switch = Switch(ip)
+        if switch.name.rack_number:
+            print(f"{switch.name.function_descriptor} {switch.name.number} {switch.name.building_number} {switch.name.building_code} {switch.name.room_number}-{switch.name.rack_number} {switch.name.node} {switch.ip}")
+        else:
+            print(f"{switch.name.function_descriptor} {switch.name.number} {switch.name.building_number} {switch.name.building_code} {switch.name.room_number} {switch.name.node} {switch.ip}")
 
-def main2() -> None:
-    """"""
-    prefer_correct_building_code = False
-    table_data = get_table_data()
-    fqdn = getfqdn(get_args().ip).removesuffix(".net.utah.edu").split("-")
 
-    function_descriptor_and_number = list(fqdn.pop(0))
+def get_ip_addresses() -> list[str]:
+    """
+    Gets the IP addresses to guess names for from the arguments, or from the --batch file or stdin.
+
+    Returns:
+        list[str]: The IP addresses in the order given.
+    """
+    args = get_args()
+    if args.batch is None:
+        return args.ip
+    if args.batch == "-":
+        return stdin.read().split()
+    with open(args.batch) as file:
+        return file.read().split()
+
+
+def _split_name(short_name: str) -> tuple[str, str, str, str, str, str]:
+    """
+    Splits a switch name into its parts one segment at a time, for names the FQDN pattern doesn't match.
+
+    Args:
+        short_name (str): The switch name without the domain.
+
+    Returns:
+        tuple[str, str, str, str, str, str]: The function descriptor, number, building number,
+        building code, room number and node.
+    """
+    segments = short_name.split("-")
+
+    function_descriptor_and_number = list(segments.pop(0))
     number = function_descriptor_and_number.pop()
     function_descriptor = "".join(function_descriptor_and_number)
 
-    building_number_and_code = fqdn.pop(0)
+    building_number_and_code = segments.pop(0)
 
-    if building_number_and_code.isdigit():
+    building_match = _BUILDING_RE.fullmatch(building_number_and_code)
+    if building_number_and_code.isdigit():  # The building code is in its own segment
         building_number = building_number_and_code
-        building_code = fqdn.pop(0)
-    elif building_number_and_code[:4].isdigit():
-        building_number = building_number_and_code[:4]
-        building_code = building_number_and_code[4:]
-    elif building_number_and_code[:3].isdigit():
-        building_number = building_number_and_code[:3]
-        building_code = building_number_and_code[3:]
+        building_code = segments.pop(0)
+    elif building_match:
+        building_number, building_code = building_match.groups()
     else:
         log.warning("Building number does not seem to be 3 or 4 digits long. Using backup method.")
-        building_number = ""
-        building_code = ""
-        for char in building_number_and_code:
-            if char.isdigit():
-                building_number += char
-            else:
-                building_code += char
+        building_number = "".join(filter(str.isdigit, building_number_and_code))
+        building_code = building_number_and_code.translate(_DROP_DIGITS)
+
+    node = segments.pop()
+
+    room_number = "-".join(segments)
+
+    return function_descriptor, number, building_number, building_code, room_number, node
+
+
+def guess_name(ip: str, fqdn: str, building_codes: dict[int, str], prefer_correct_building_code: bool = False) -> str:
+    """
+    Guesses the name parts of a switch from its current FQDN.
+
+    Args:
+        ip (str): The IP address of the switch.
+        fqdn (str): The FQDN the IP address resolves to.
+        building_codes (dict[int, str]): The lowercase building code for each building number.
+        prefer_correct_building_code (bool): Whether to use the building list's code over the one in the FQDN.
+
+    Returns:
+        str: The space separated name parts followed by the IP address, ready to pass to uit_name_updater.
+    """
+    short_name = fqdn.removesuffix(".net.utah.edu")
+
+    match = _NAME_RE.fullmatch(short_name)
+    if match:
+        function_descriptor, number, building_number, building_code, room_number, node = match.groups()
+    else:
+        function_descriptor, number, building_number, building_code, room_number, node = _split_name(short_name)
     building_number = building_number.lstrip("0")
 
-    # Testing the get_table_data function
-    building_data = table_data.loc[int(building_number)]
-    building_data_code = building_data["Abbreviation"].lower()
+    building_data_code = building_codes[int(building_number)]
     if building_code != building_data_code:
         if prefer_correct_building_code:
             # log.warning(f"Building code does not match. Expected: '{building_data_code}'. Got: '{building_code}'. Using expected value.")  # Disabled because it messes up the output when using as input for name changer
@@ -98,12 +175,26 @@ def main2() -> None:
             pass
         building_code = building_code.removeprefix("_")
 
-    node = fqdn.pop()
+    # print(f"{function_descriptor=}\n{number=}\n{building_number=}\n{building_code=}\n{room_number=}\n{node=}")  # DEBUG
+    return f"{function_descriptor} {number} {building_number} {building_code} {room_number} {node} {ip}"
 
-    room_number = "-".join(fqdn)
 
-    # print(f"{fqdn=}\n{function_descriptor=}\n{number=}\n{building_number=}\n{building_code=}\n{room_number=}\n{node=}")  # DEBUG
-    print(f"{function_descriptor} {number} {building_number} {building_code} {room_number} {node} {get_args().ip}")
+def main2() -> None:
+    """"""
+    ip_addresses = get_ip_addresses()
+    table_data = get_cached_table_data()
+    # Plain dict lookups per switch instead of a pandas .loc for each one
+    building_codes = table_data["Abbreviation"].str.lower().to_dict()
+
+    # Reverse lookups are the slow part, so resolve every address at once and print in the order given
+    with ThreadPoolExecutor(max_workers=min(32, len(ip_addresses) or 1)) as executor:
+        fqdns = executor.map(getfqdn, ip_addresses)
+
+    for ip, fqdn in zip(ip_addresses, fqdns):
+        try:
+            print(guess_name(ip, fqdn, building_codes))
+        except (IndexError, KeyError, ValueError) as e:
+            log.error(f"Could not guess a name for {ip} from '{fqdn}': {e!r}")
 
 
 if __name__ == "__main__":
@@ -7,34 +7,49 @@ It generates a new name for the device based on the given parameters and updates
 
 # Standard libraries
 import argparse
-import ipaddress
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import csv
+from functools import lru_cache
+import json
 import logging
+import os
+from pathlib import Path
 import re
-from bs4 import BeautifulSoup
+import subprocess
+import sys
 from sys import exit
-import webbrowser  # TODO: Evaluate if this is needed
-from socket import gethostbyname
-from socket import gaierror
+from socket import getaddrinfo, gaierror, AF_INET, SOCK_STREAM
 from time import sleep
 import urllib3
-from threading import Thread
+from threading import Lock
+from typing import Callable, Final, NamedTuple, TYPE_CHECKING
 
 # Third-party libraries
 import requests
+from requests.adapters import HTTPAdapter
 from rich_argparse import RichHelpFormatter
 from rich.console import Console
 from rich.logging import RichHandler
 from rich.prompt import Confirm
 from rich.table import Table
 from rich import print as rprint
-from uit_duo import Duo, get_form_args
-from netmiko import ConnectHandler, SSHDetect, BaseConnection
-from netmiko import NetmikoAuthenticationException, NetmikoTimeoutException, ConfigInvalidException
-import orionsdk
-from playwright.sync_api import Playwright, sync_playwright, expect
 from yarl import URL
 
+if TYPE_CHECKING:
+    from netmiko import BaseConnection
+    from playwright.sync_api import Playwright
+
 # Local libraries
+from uit_device_types import (
+    forget_device_type,
+    get_cached_device_type,
+    get_device_type,
+    guess_device_type,
+    load_device_type_cache,
+    save_device_type_cache,
+)
+from uit_name_common import name_generator, pad_number, switch_commands_generator, validate_ip_address
 
 
 # Standard exit codes
@@ -43,6 +58,11 @@ EXIT_GENERAL_ERROR = 1  # General error
 EXIT_INVALID_ARGUMENT = 120  # Invalid argument to exit
 EXIT_KEYBOARD_INTERRUPT = 130  # Keyboard interrupt (Ctrl+C)
 
+DOMAIN_NAME: Final = ".net.utah.edu"  # Domain every switch name is registered under
+WAPI_URL: Final = "https://ddi.utah.edu/wapi/v2.12/"  # InfoBlox REST API
+DDI_STATE_FILE = Path.home() / ".uit_ddi_state.json"  # Saved InfoBlox web UI cookies, so the login can be skipped
+CHANGE_TIMEOUT = 120  # Seconds to wait for all the confirmed changes before reporting the ones still running
+
 CONSOLE = Console()
 
 # Logging setup
@@ -55,6 +75,9 @@ logging.basicConfig(
 log: logging.Logger = logging.getLogger("rich")
 logging.getLogger("paramiko").setLevel(logging.WARNING)  # Suppress Paramiko info logs
 
+# Orion and toast.utah.edu are both used without certificate verification, silence the warnings once
+urllib3.disable_warnings()
+
 
 try:
     from auth import UofU, SSH
@@ -79,10 +102,36 @@ except ImportError:
         cisPassword = ORION_PASSWORD
 
 
+# SWQL for looking up nodes, built once here, the values are always passed as query parameters
+_NODE_QUERY = "SELECT (URI, NodeID, IP, DNS, NodeName, Location) FROM Orion.Nodes "
+_NODE_BY_IP_QUERY = _NODE_QUERY + "WHERE IP=@value"
+_NODE_BY_LOCATION_QUERY = _NODE_QUERY + "WHERE Location LIKE @value"
+_NODE_BY_DNS_QUERY = _NODE_QUERY + "WHERE DNS LIKE @value"
+_ONE_NODE_BY_IP_QUERY = "SELECT TOP 1 URI, NodeID, IP, DNS, NodeName, Location FROM Orion.Nodes WHERE IP=@ip"
+_NODES_BY_IPS_QUERY = "SELECT URI, NodeID, IP, DNS, NodeName, Location FROM Orion.Nodes WHERE IP IN ({})"
+
+
+class SwitchRow(NamedTuple):
+    """A node from Orion.Nodes, with the fields get_switches selects."""
+    uri: str
+    node_id: int
+    ip: str
+    dns: str
+    node_name: str
+    location: str
+
+
 class Orion:
     def __init__(self, server, username: str, password: str):
-        orionsdk.swisclient.requests.packages.urllib3.disable_warnings()
+        import orionsdk  # Imported here so --help and argument errors don't wait on loading it
+
         self.swis = orionsdk.SwisClient(server, username, password, port=17778)
+        # Keep connections to the SWIS server open between queries
+        swis_session = getattr(self.swis, "_session", None)
+        if isinstance(swis_session, requests.Session):
+            swis_session.mount("https://", HTTPAdapter(pool_maxsize=8))
+        self._switch_cache = {}  # get_switch results for this client, keyed by the filter used
+        self._row_cache: dict[str, SwitchRow] = {}  # get_switches results for this client, keyed by IP
 
     def get_dev_info(self):
         """
@@ -112,25 +161,77 @@ class Orion:
         Raises:
             ValueError: Caused when no information is given.
         """
-        result = ""
-        query = "SELECT (URI, NodeID, IP, DNS, NodeName, Location) FROM Orion.Nodes "
-        if ip:
-            ip = ip.split("/")[0]  # get rid of CIDR just in case
-            result = self.swis.query(query + f"WHERE IP='{ip}'")
-        elif proptag or barcode:
-            result = self.swis.query(
-                query
-                + "WHERE Location LIKE '%"
-                + str(proptag if proptag else barcode)
-                + "%'"
+        # The first filter that was given is used, in this order
+        # The values are sent as SWIS query parameters so they are never pasted into the query text
+        filters = (
+            (_NODE_BY_IP_QUERY, ip.split("/")[0] if ip else None),  # get rid of CIDR just in case
+            (_NODE_BY_LOCATION_QUERY, f"%{proptag or barcode}%" if proptag or barcode else None),
+            (_NODE_BY_DNS_QUERY, f"%{dns_name}%" if dns_name else None),
+        )
+        for query, value in filters:
+            if value:
+                key = (query, value)
+                if key not in self._switch_cache:
+                    self._switch_cache[key] = self.swis.query(query, value=value)
+                return self._switch_cache[key]
+
+        raise ValueError("no information given")
+    
+    def get_switches(self, ips) -> dict[str, SwitchRow]:
+        """
+        Get the Orion nodes for several IP addresses with a single query.
+
+        IP addresses that have already been looked up by this client are not queried again.
+
+        Args:
+            ips (Iterable[str]): The IP addresses of the switches.
+
+        Returns:
+            dict[str, SwitchRow]: The nodes found, keyed by IP address. IP addresses not in Orion are left out.
+        """
+        missing = [ip for ip in dict.fromkeys(ips) if ip not in self._row_cache]
+        if missing:
+            params = {f"ip{i}": ip for i, ip in enumerate(missing)}
+            query = _NODES_BY_IPS_QUERY.format(", ".join(f"@{name}" for name in params))
+            for result in self.swis.query(query, **params).get("results", []):
+                row = SwitchRow(
+                    result["URI"],
+                    result["NodeID"],
+                    result["IP"],
+                    result["DNS"],
+                    result["NodeName"],
+                    result["Location"],
+                )
+                self._row_cache[row.ip] = row
+        return {ip: self._row_cache[ip] for ip in ips if ip in self._row_cache}
+
+    def get_switch_one(self, ip: str) -> SwitchRow | None:
+        """
+        Get the Orion node for a single IP address.
+
+        Rows already fetched by get_switches are used without querying again.
+
+        Args:
+            ip (str): The IP address of the switch.
+
+        Returns:
+            SwitchRow | None: The node, or None if the IP address isn't in Orion.
+        """
+        if ip not in self._row_cache:
+            results = self.swis.query(_ONE_NODE_BY_IP_QUERY, ip=ip).get("results")
+            if not results:
+                return None
+            result = results[0]
+            self._row_cache[ip] = SwitchRow(
+                result["URI"],
+                result["NodeID"],
+                result["IP"],
+                result["DNS"],
+                result["NodeName"],
+                result["Location"],
             )
-        elif dns_name:
-            result = self.swis.query(query + "WHERE DNS LIKE '%" + dns_name + "%'")
-        else:
-            raise ValueError("no information given")
+        return self._row_cache[ip]
 
-        return result
-    
     def change_orion_node_name(self, uri: str, new_name: str):
         """
         Changes the name of an Orion node.
@@ -142,11 +243,30 @@ class Orion:
         Returns:
         None
         """
-        if not new_name.endswith(".net.utah.edu"):
-            new_name = new_name + ".net.utah.edu"
-        log.debug(f"Changing Orion Node Name: {new_name}")
+        if not new_name.endswith(DOMAIN_NAME):
+            new_name = f"{new_name}{DOMAIN_NAME}"
+        log.debug("Changing Orion Node Name: %s", new_name)
 
         self.swis.update(uri, NodeName=new_name)
+        # Cached results have the old name
+        self._switch_cache.clear()
+        self._row_cache.clear()
+
+
+@lru_cache(maxsize=4)
+def get_orion(server: str, username: str, password: str) -> Orion:
+    """
+    Returns the Orion client for the given server and credentials, creating it on first use.
+
+    Args:
+        server (str): The Orion server to connect to.
+        username (str): The username to log in with.
+        password (str): The password to log in with.
+
+    Returns:
+        Orion: The shared client, so its connections and cached lookups are reused.
+    """
+    return Orion(server, username, password)
 
 
 def remove_duplicates(lst: list) -> list:
@@ -164,22 +284,125 @@ def remove_duplicates(lst: list) -> list:
     return res
 
 
-def get_args() -> argparse.Namespace:
+# The hostname is the first word of the "<hostname> uptime is ..." line of show version (IOS and IOS-XE), NX-OS
+# prints "Kernel uptime is ..." instead so that line is skipped
+_UPTIME_RE = re.compile(r"^\s*(?!Kernel\s)(\S+)\s+uptime is", re.MULTILINE)
+# NX-OS has the hostname on the "Device name: <hostname>" line of show version
+_DEVICE_NAME_RE = re.compile(r"^\s*Device name:\s*(\S+)", re.MULTILINE)
+
+_connections: dict[str, "BaseConnection"] = {}
+_connections_lock = Lock()
+
+
+def get_connection(switch_ip: str) -> "BaseConnection":
     """
-    Parse command line arguments and return the parsed arguments as a Namespace object.
+    Returns an open SSH connection to the switch, reusing the one from earlier in the run if it is still alive.
 
-    This function uses the argparse module to define and parse command line arguments.
-    It expects the following arguments:
-    - function_descriptor: The descriptor for the switch type. 'dx' for distribution switches and 'sx' for access switches.
-    - count: The count of the type of device in the same room.
-    - building_number: The building number where the switch is located. (Will be padded with 0's to 4 digits)
-    - building_short_name: The short name of the building where the switch is located.
-    - room_number: The room number where the switch is located. (Will be padded with 0's to 4 digits)
-    - distribution_node: The distribution node where the switch is connected.
-    - switch_ip: The IP address of the switch.
+    Connections are left open until the script exits, so a switch is only logged in to once per run.
+
+    Args:
+        switch_ip (str): The IP address of the switch.
 
     Returns:
-        argparse.Namespace: The parsed command line arguments.
+        BaseConnection: The connection to the switch.
+
+    Raises:
+        NetmikoAuthenticationException: If the switch rejects the SSH credentials.
+        NetmikoTimeoutException: If the switch can't be reached.
+    """
+    with _connections_lock:
+        connection = _connections.get(switch_ip)
+    if connection is not None and connection.is_alive():
+        log.debug("Reusing connection to %s", switch_ip)
+        return connection
+
+    switch_connection_dict = {
+        "device_type": "autodetect",
+        "host": switch_ip,
+        "username": SSH.username,
+        "password": SSH.password,
+    }
+    from netmiko import ConnectHandler  # Imported here so --help and argument errors don't wait on loading it
+    from netmiko import NetmikoAuthenticationException, NetmikoTimeoutException
+
+    connection = None
+    # Switches seen before skip SSHDetect, so only one SSH session is opened to them.
+    # An unseen switch first tries the device type its /24 agrees on. Either way SSHDetect is the fallback if the
+    # type fails, a cached type is dropped first since the switch's hardware or OS may have changed.
+    cached_device_type = get_cached_device_type(switch_ip)
+    device_type = cached_device_type or guess_device_type(switch_ip)
+    if device_type:
+        log.debug(
+            "Trying %s device type %s for %s", "cached" if cached_device_type else "guessed", device_type, switch_ip
+        )
+        try:
+            connection = ConnectHandler(**{**switch_connection_dict, "device_type": device_type})
+        except (NetmikoAuthenticationException, NetmikoTimeoutException):
+            raise  # SSHDetect would fail the same way
+        except Exception as e:
+            log.debug("Device type %s failed for %s: %s", device_type, switch_ip, e)
+            if cached_device_type:
+                forget_device_type(switch_ip)
+
+    if connection is None:
+        switch_connection_dict["device_type"] = get_device_type(switch_connection_dict)  # Not cached, so detected
+        if logging.getLogger().getEffectiveLevel() == logging.DEBUG:
+            dev_device_dict = switch_connection_dict.copy()
+            dev_device_dict["password"] = "********"
+            log.debug("Device dictionary: %s", dev_device_dict)
+            del dev_device_dict
+        connection = ConnectHandler(**switch_connection_dict)
+
+    with _connections_lock:
+        _connections[switch_ip] = connection
+    return connection
+
+
+@atexit.register
+def close_connections() -> None:
+    """
+    Disconnects every switch connection opened by get_connection.
+
+    Returns:
+        None
+    """
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for connection in connections:
+        try:
+            connection.disconnect()
+        except Exception as e:  # The session may already be gone, nothing else to clean up
+            log.debug("Error while disconnecting: %s", e)
+    log.debug("Switch connections closed.")
+
+
+def get_switch_name(connection: "BaseConnection") -> str:
+    """
+    Get the current hostname of the switch.
+
+    Args:
+        connection (BaseConnection): The connection object used to communicate with the switch.
+
+    Returns:
+        str: The current hostname of the switch.
+    """
+    name_re = _DEVICE_NAME_RE if "nxos" in connection.device_type else _UPTIME_RE
+    match = name_re.search(connection.send_command("show version"))
+    if match:
+        return match.group(1)
+
+    # Fall back to Genie if the output doesn't have the hostname line
+    log.debug("Hostname not found in show version, parsing it with Genie")
+    return connection.send_command("show version", use_genie=True).get("version", {}).get("hostname")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the command line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser for this script's arguments.
     """
     parser = argparse.ArgumentParser(
         description="This script figures out the proper name for a switch based on the "
@@ -189,6 +412,7 @@ def get_args() -> argparse.Namespace:
 
     parser.add_argument(
         "function_descriptor",
+        nargs="?",
         type=str,
         help="The descriptor for the switch type. 'dx' for distribution switches and 'sx' for access switches.",
         metavar="FUNCTION_DESCRIPTOR",
@@ -197,6 +421,7 @@ def get_args() -> argparse.Namespace:
 
     parser.add_argument(
         "count",
+        nargs="?",
         type=str,
         help="The count of the type of device in the same room.",
         metavar="COUNT"
@@ -204,13 +429,15 @@ def get_args() -> argparse.Namespace:
 
     parser.add_argument(
         "building_number",
-        type=str,
+        nargs="?",
+        type=pad_number,
         help="The building number where the switch is located. (Will be padded with 0's to 4 digits)",
         metavar="BUILDING_NUMBER"
     )
 
     parser.add_argument(
         "building_short_name",
+        nargs="?",
         type=str,
         help="The short name of the building where the switch is located. (As specified in https://www.space.utah.edu/htdocs/requestBuildingList.php)",
         metavar="BUILDING_SHORT_NAME"
@@ -218,13 +445,15 @@ def get_args() -> argparse.Namespace:
 
     parser.add_argument(
         "room_number",
-        type=str,
+        nargs="?",
+        type=pad_number,
         help="The room number where the switch is located. (Will be padded with 0's to 4 digits)",
         metavar="ROOM_NUMBER"
     )
 
     parser.add_argument(
         "distribution_node",
+        nargs="?",
         type=str,
         help="The distribution node where the switch is connected.",
         metavar="DISTRIBUTION_NODE"
@@ -232,11 +461,34 @@ def get_args() -> argparse.Namespace:
 
     parser.add_argument(
         "switch_ip",
+        nargs="?",
         type=validate_ip_address,  # Validate the IP address
         help="The IP address of the switch.",
         metavar="SWITCH_IP"
     )
 
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="A CSV file of switches to check instead of the positional arguments. It needs a header row with the "
+        "columns function_descriptor, count, building_number, building_short_name, room_number, "
+        "distribution_node and switch_ip.",
+        metavar="CSV_FILE"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="How many switches to gather information from at the same time in batch mode. (Default: 16)",
+    )
+
+    parser.add_argument(
+        "--use-browser",
+        action="store_true",
+        help="Change DNS names by driving the InfoBlox web UI with Playwright instead of the InfoBlox API.",
+    )
+
     parser.add_argument(
         "--log-level",
         type=str,
@@ -245,40 +497,101 @@ def get_args() -> argparse.Namespace:
         help=argparse.SUPPRESS
     )
 
-    return parser.parse_args()
+    return parser
+
+
+# The fields that describe one switch, as positional arguments or batch CSV columns
+SWITCH_FIELDS = (
+    "function_descriptor",
+    "count",
+    "building_number",
+    "building_short_name",
+    "room_number",
+    "distribution_node",
+    "switch_ip",
+)
+
+# The parser is built once at import time, get_args only has to parse
+_PARSER = _build_parser()
 
 
-def get_switch_name(connection: BaseConnection) -> str:
+def get_args() -> argparse.Namespace:
     """
-    Get the current hostname of the switch.
+    Parse command line arguments and return the parsed arguments as a Namespace object.
 
-    Args:
-        connection (BaseConnection): The connection object used to communicate with the switch.
+    The arguments are parsed with the module level parser, which is only built once.
+    It expects the following arguments:
+    - function_descriptor: The descriptor for the switch type. 'dx' for distribution switches and 'sx' for access switches.
+    - count: The count of the type of device in the same room.
+    - building_number: The building number where the switch is located. (Will be padded with 0's to 4 digits)
+    - building_short_name: The short name of the building where the switch is located.
+    - room_number: The room number where the switch is located. (Will be padded with 0's to 4 digits)
+    - distribution_node: The distribution node where the switch is connected.
+    - switch_ip: The IP address of the switch.
+
+    The positional arguments are only required when --batch isn't used, and can't be combined with it.
 
     Returns:
-        str: The current hostname of the switch.
+        argparse.Namespace: The parsed command line arguments.
     """
-    return connection.send_command("show version", use_genie=True).get("version", {}).get("hostname")
+    args = _PARSER.parse_args()
+    if args.batch:
+        if any(getattr(args, name) is not None for name in SWITCH_FIELDS):
+            _PARSER.error("the switch arguments can't be used with --batch")
+    else:
+        missing = [name.upper() for name in SWITCH_FIELDS if getattr(args, name) is None]
+        if missing:
+            _PARSER.error(f"the following arguments are required: {', '.join(missing)}")
+    if args.workers < 1:
+        _PARSER.error("--workers must be at least 1")
+    return args
 
 
-def validate_ip_address(ip: str) -> str:
+def read_batch_file(path: str) -> list[argparse.Namespace]:
     """
-    Validates the given IP address.
+    Reads the switches to check from a batch CSV file.
 
     Args:
-        ip (str): The IP address to validate.
+        path (str): The path to the CSV file.
 
     Returns:
-        str: The validated IP address.
+        list[argparse.Namespace]: One namespace per switch with the same fields as the positional arguments.
 
     Raises:
-        argparse.ArgumentTypeError: If the IP address is invalid.
+        SystemExit: If a row is missing a field or has an invalid value, via the argument parser's error.
     """
-    try:
-        ipaddress.ip_address(ip)
-        return ip
-    except ValueError:
-        raise argparse.ArgumentTypeError("Invalid IP address")
+    switches = []
+    with open(path, newline="") as file:
+        for line_number, row in enumerate(csv.DictReader(file), start=2):  # Line 1 is the header
+            missing = [name for name in SWITCH_FIELDS if not (row.get(name) or "").strip()]
+            if missing:
+                _PARSER.error(f"{path} line {line_number} is missing: {', '.join(missing)}")
+
+            switch = argparse.Namespace(**{name: row[name].strip() for name in SWITCH_FIELDS})
+            # Padded here like the positional arguments so every later use sees the same values
+            switch.building_number = pad_number(switch.building_number)
+            switch.room_number = pad_number(switch.room_number)
+            if switch.function_descriptor not in ("dx", "sx"):
+                _PARSER.error(f"{path} line {line_number}: function_descriptor must be 'dx' or 'sx'")
+            try:
+                validate_ip_address(switch.switch_ip)
+            except argparse.ArgumentTypeError as e:
+                _PARSER.error(f"{path} line {line_number}: {e}")
+            switches.append(switch)
+    return switches
+
+
+def get_ddi_names(results: dict) -> list[str]:
+    """
+    Gets the DNS names from a DDI search result.
+
+    Args:
+        results (dict): The "result" part of a ddi_search response.
+
+    Returns:
+        list[str]: The DNS names in the order InfoBlox lists them, with any stray whitespace removed.
+    """
+    return [name.strip() for name in results.get("names", "").split(",")]
 
 
 def dns_change_allowed_checker(results: dict) -> str | None:
@@ -311,38 +624,53 @@ def dns_change_allowed_checker(results: dict) -> str | None:
             return obj.split(":")[2].split("/")[0]
 
 
-def name_generator(function_descriptor: str, count: str, building_number: str,
-                   building_short_name: str, room_number: str, distribution_node: str) -> str:
+def get_host_record_ref(results: dict) -> str | None:
     """
-    Generates a name for a network device based on the given parameters.
+    Gets the host record's InfoBlox API reference from the lookup results.
+
+    The objects are WAPI "_ref"s like "record:host/<id>:<fqdn>/<view>", so the record can be fetched and changed
+    directly instead of being searched for again.
 
     Args:
-        function_descriptor (str): The function descriptor for the device.
-        count (str): The count of the device.
-        building_number (str): The building number of the device. (Padded with 0's to 4 digits)
-        building_short_name (str): The short name of the building.
-        room_number (str): The room number of the device. (Padded with 0's to 4 digits)
-        distribution_node (str): The distribution node of the device.
+        results (dict): The dictionary containing the results.
 
     Returns:
-        str: The generated name for the network device.
+        str | None: The reference of the first host record, or None if there isn't one.
+    """
+    objects = results.get("objects") or results["result"]["objects"]
+    return next((obj for obj in objects if obj.startswith("record:host")), None)
+
+
+@lru_cache(maxsize=256)
+def _resolve(name: str) -> str | None:
     """
-    building_short_name = building_short_name.replace(" ", "")  # Remove spaces from the building short name
+    Resolves a host name to its IPv4 address, remembering the answer for the rest of the run.
 
-    if building_short_name[0].isnumeric():  # If the building short name starts with a number
-        building_short_name = f"-{building_short_name}"  # Add a hyphen to the beginning of the building short name
+    Args:
+        name (str): The host name to resolve.
 
-    # This is a temp fix for when current room numbers are listed as 'mdf' rather than a proper number.
-    # This will be removed once all room numbers are properly listed.
-    # If proper room number is known, it should be used instead of 'mdf'.
-    if room_number not in ["mdf", "lab"]:  # If the room number is not 'mdf' or 'lab' (temporary fix until all room numbers are properly listed)
-        room_number = room_number.zfill(4) # Pad the room number with 0's to 4 digits
+    Returns:
+        str | None: The first IPv4 address for the name, or None if it doesn't resolve.
+    """
+    try:
+        return getaddrinfo(name, None, family=AF_INET, type=SOCK_STREAM)[0][4][0]
+    except gaierror:
+        return None
 
-    switch_name = f"{function_descriptor}{count}-{building_number.zfill(4)}{building_short_name}-{room_number}-{distribution_node}".lower()
 
-    log.debug(f"Generated Switch Name: {switch_name}")
+@lru_cache(maxsize=64)
+def building_number_variants(building_number: str) -> tuple[str, ...]:
+    """
+    Gets each way a building number can be written, from no padding up to padded with 0's to 4 digits.
 
-    return switch_name
+    Args:
+        building_number (str): The building number, padded or not.
+
+    Returns:
+        tuple[str, ...]: The distinct forms of the building number, shortest first.
+    """
+    building_number = str(int(building_number))  # Convert the building number to an integer and then back to a string to remove leading 0's
+    return tuple(dict.fromkeys(building_number.zfill(number) for number in range(5)))
 
 
 def demark_alias_generator(building_number: str, switch_count: str, ip_address: str) -> list[str]:
@@ -363,77 +691,84 @@ def demark_alias_generator(building_number: str, switch_count: str, ip_address:
 
 
     demark_aliases = []
-    building_numbers = []
-    building_number = str(int(building_number))  # Convert the building number to an integer and then back to a string to remove leading 0's
-    for number in range(5):
-        building_numbers.append(building_number.zfill(number))
-    building_numbers = remove_duplicates(building_numbers)
+    candidates = [
+        f"dx{switch_count}-{number}{DOMAIN_NAME}" for number in building_number_variants(building_number)
+    ]
 
-    for building_number in building_numbers:
-        demark_alias = f"dx{switch_count}-{building_number}.net.utah.edu"
-        try:
-            demark_ip = gethostbyname(demark_alias)
-            log.debug(f"Resolved {demark_alias} to {demark_ip}")
-            if demark_ip != ip_address:
-                log.warning(f"'{demark_alias}' resolves to '{demark_ip}' but should resolve to '{ip_address}'.")
-        except gaierror:
-            log.debug(f"Unable to resolve {demark_alias}")
+    # Resolve every candidate at once, the results come back in candidate order so the output stays the same
+    with ThreadPoolExecutor(max_workers=len(candidates)) as resolvers:
+        demark_ips = list(resolvers.map(_resolve, candidates))
+
+    for demark_alias, demark_ip in zip(candidates, demark_ips):
+        if demark_ip is None:
+            log.debug("Unable to resolve %s", demark_alias)
             demark_aliases.append(demark_alias)
+        else:
+            log.debug("Resolved %s to %s", demark_alias, demark_ip)
+            if demark_ip != ip_address:
+                log.warning("'%s' resolves to '%s' but should resolve to '%s'.", demark_alias, demark_ip, ip_address)
 
     return demark_aliases
 
 
-def location_generator(building_number: str, room_number: str) -> str:
+_duo_session: requests.Session | None = None
+_duo_session_lock = Lock()
+_duo_login_error: Exception | None = None  # Why the login failed, so later callers don't send another push
+_ddi_logged_in = False
+_ddi_login_lock = Lock()
+
+
+def _get_duo_session() -> requests.Session:
     """
-    Generates a location string for a network device based on the given building and room numbers.
+    Logs in through Duo once and returns the session, so the DDI lookups and ServiceNow share one login.
 
-    Args:
-        building_number (str): The building number of the device. (Padded with 0's to 4 digits)
-        room_number (str): The room number of the device. (Padded with 0's to 4 digits)
+    The login is guarded by a lock so callers running in parallel don't each send a Duo push. If the login fails,
+    e.g. the push is denied, the error is raised again for the rest of the run instead of sending another push.
 
     Returns:
-        str: The generated location string for the network device.
-    """
-    return f"Bldg. {building_number.zfill(4)} Room {room_number.zfill(4)}"
-
-
-def switch_commands_generator(switch_name: str, building_number: str, room_number: str) -> list:
-    """
-    Generate a list of commands for configuring a switch.
-
-    :param switch_name: The name of the switch.
-    :param building_number: The number of the building where the switch is located.
-    :param room_number: The number of the room where the switch is located.
-    :return: A list of commands for configuring the switch.
-    """
-    return [
-        f"hostname {switch_name}",
-        f"snmp-server location {location_generator(building_number, room_number)}",
-        "banner login ^",
-        "\n",
-        switch_name,
-        "\n",
-        "University of Utah Network:  All use of this device must comply",
-        "with the University of Utah policies and procedures.  Any use of",
-        "this device, whether deliberate or not will be held legally",
-        "responsible.  See University of Utah Information Security",
-        "Policy (4-004) for details.",
-        "\n",
-        "Problems within the University of Utah's network should be reported",
-        "by calling the Campus Helpdesk at 581-4000, or via e-mail at",
-        "helpdesk@utah.edu",
-        "\n",
-        "DO NOT LOGIN",
-        "if you are not authorized by NetCom at the University of Utah.",
-        "\n\n",
-        "^"
-    ]
+        requests.Session: The logged in session, with a larger connection pool for repeated requests.
+    """
+    global _duo_session, _duo_login_error
+    with _duo_session_lock:
+        if _duo_login_error is not None:
+            raise _duo_login_error
+        if _duo_session is None:
+            from uit_duo import Duo
+
+            duo = Duo(uNID=UofU.unid, password=UofU.cisPassword)
+            try:
+                session = duo.login()
+            except Exception as e:
+                _duo_login_error = e
+                raise
+            session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=3))
+            _duo_session = session
+        return _duo_session
+
+
+def _get_ddi_session() -> requests.Session:
+    """
+    Logs the shared Duo session in to toast.utah.edu once and returns it, so every DDI lookup reuses it.
+
+    Returns:
+        requests.Session: The logged in session. Requests to toast.utah.edu need verify=False.
+    """
+    global _ddi_logged_in
+    session = _get_duo_session()
+    with _ddi_login_lock:
+        if not _ddi_logged_in:
+            session.get("https://toast.utah.edu/login_helper", verify=False)
+            _ddi_logged_in = True
+    return session
 
 
+@lru_cache(maxsize=256)
 def ddi_search(ip: str) -> dict:
     """
     Search for information about a host using its IP address.
 
+    Results are cached per IP address, call clear_caches after changing a record to see the new data.
+
     Args:
         ip (str): The IP address of the host to search for.
 
@@ -443,41 +778,152 @@ def ddi_search(ip: str) -> dict:
     Raises:
         requests.HTTPError: If the HTTP request to the API fails.
     """
-    duo = Duo(uNID=UofU.unid, password=UofU.cisPassword)
-    session = duo.login()  #TODO: find a better place for this
-    urllib3.disable_warnings()
-    session.verify = False
-    session.get("https://toast.utah.edu/login_helper")
-    r = session.get("https://toast.utah.edu/infoblox/host", params={"ip": ip})
+    session = _get_ddi_session()
+    r = session.get("https://toast.utah.edu/infoblox/host", params={"ip": ip}, verify=False)
+    r.raise_for_status()
+    data = r.json()
+    log.debug("DDI Search Response: %s", data)
+    return data
+
+
+_wapi_session: requests.Session | None = None
+_wapi_session_lock = Lock()
+
+
+def _get_wapi_session() -> requests.Session:
+    """
+    Creates the InfoBlox API session once and returns it, so every API call reuses its connections.
+
+    Returns:
+        requests.Session: A session that authenticates to the InfoBlox API with the CIS credentials.
+    """
+    global _wapi_session
+    with _wapi_session_lock:
+        if _wapi_session is None:
+            session = requests.Session()
+            session.auth = (UofU.unid, UofU.cisPassword)
+            session.verify = False
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=3))
+            _wapi_session = session
+        return _wapi_session
+
+
+def infoblox_get_host(ref: str) -> dict:
+    """
+    Gets an InfoBlox host record by its reference.
+
+    Args:
+        ref (str): The "_ref" of the host record, as found by get_host_record_ref.
+
+    Returns:
+        dict: The host record with its "_ref", "name" and "aliases".
+
+    Raises:
+        requests.HTTPError: If the API request fails, e.g. the record no longer exists.
+    """
+    r = _get_wapi_session().get(WAPI_URL + ref, params={"_return_fields": "name,aliases"})
     r.raise_for_status()
-    log.debug(f"DDI Search Response: {r.json()}")
     return r.json()
 
 
+def infoblox_update_host(ref: str, new_name: str, aliases: list[str]) -> None:
+    """
+    Renames an InfoBlox host record and sets its aliases in a single API call.
+
+    Args:
+        ref (str): The "_ref" of the host record.
+        new_name (str): The new fully qualified name of the host record.
+        aliases (list[str]): Every alias the record should have, this replaces the current list.
+
+    Raises:
+        requests.HTTPError: If the API rejects the change.
+    """
+    r = _get_wapi_session().put(WAPI_URL + ref, json={"name": new_name, "aliases": aliases})
+    r.raise_for_status()
+
+
+def dns_changer_wapi(host_ref: str, desired_dns: str, current_dns: str, aliases: list[str] = []) -> None:
+    """
+    Renames the host record through the InfoBlox API and keeps the old name and the given aliases as aliases.
+
+    Args:
+        host_ref (str): The "_ref" of the host record, as found by get_host_record_ref.
+        desired_dns (str): The new name for the host record, with or without the domain.
+        current_dns (str): The current name of the host record, with or without the domain.
+        aliases (list[str]): Aliases to add to the host record.
+
+    Returns:
+        None
+    """
+    current_fqdn = f"{current_dns.removesuffix(DOMAIN_NAME)}{DOMAIN_NAME}"
+    desired_fqdn = f"{desired_dns.removesuffix(DOMAIN_NAME)}{DOMAIN_NAME}"
+
+    try:
+        record = infoblox_get_host(host_ref)
+    except requests.HTTPError as e:
+        log.error("Unable to get the InfoBlox host record '%s', please resolve manually: %s", current_fqdn, e)
+        return
+
+    # Setting aliases replaces the list, so keep the existing ones and add the old name and the new aliases
+    new_aliases = remove_duplicates([
+        *record.get("aliases", []),
+        *(f"{alias.removesuffix(DOMAIN_NAME)}{DOMAIN_NAME}" for alias in [current_fqdn, *aliases]),
+    ])
+    log.debug("Updating %s to %s with aliases %s", record["_ref"], desired_fqdn, new_aliases)
+
+    try:
+        infoblox_update_host(record["_ref"], desired_fqdn, new_aliases)
+    except requests.HTTPError as e:
+        log.error("Error encountered saving the new name, please resolve manually: %s", e.response.text)
+
+
+def clear_caches() -> None:
+    """
+    Clears the cached lookup results so the next lookups go back to the source.
+
+    Returns:
+        None
+    """
+    ddi_search.cache_clear()
+
+
 def dns_changer_playwright(
-    playwright: Playwright,
+    playwright: "Playwright",
     ip_address: str,
     desired_dns: str,
     current_dns: str,
     aliases: list[str] = [],
     headless: bool = True
 ) -> None:
+    # Imported here so scripts that never reach the DNS change don't pay for loading Playwright
+    from playwright.sync_api import expect
+
     log.debug("Opening InfoBlox in Playwright")
-    log.debug(f"Current DNS: '{current_dns}' Desired DNS: '{desired_dns}' Aliases: '{aliases}'")
+    log.debug("Current DNS: '%s' Desired DNS: '%s' Aliases: '%s'", current_dns, desired_dns, aliases)
     browser = playwright.chromium.launch(headless=headless)
-    context = browser.new_context()  # TODO: add logic for saving and reusing session info
+    # Reuse the cookies from the last run so a still valid session skips the login
+    context = browser.new_context(storage_state=DDI_STATE_FILE if DDI_STATE_FILE.exists() else None)
     page = context.new_page()
-    current_dns = current_dns.removesuffix(".net.utah.edu")  # Remove the domain from the current DNS
+    current_dns = current_dns.removesuffix(DOMAIN_NAME)  # Remove the domain from the current DNS
     if current_dns not in aliases:  # If the current DNS is not in the aliases list
         aliases.append(current_dns)  # Add the current DNS to the aliases list
-        log.debug(f"Added current DNS to aliases: {current_dns}")
+        log.debug("Added current DNS to aliases: %s", current_dns)
     aliases = remove_duplicates(aliases)  # Remove duplicates from the aliases list
     page.goto("https://ddi.utah.edu/ui/")
 
-    # Login
-    page.get_by_label("Username").fill(UofU.unid)
-    page.get_by_label("Password").fill(UofU.cisPassword)
-    page.get_by_role("button", name="Login").click()
+    # Login, only needed when the saved session has expired
+    login_button = page.get_by_role("button", name="Login")
+    search_link = page.get_by_role("link", name="Search")
+    login_button.or_(search_link).first.wait_for()  # Wait for either the login form or the logged in page to load
+    if login_button.is_visible():
+        page.get_by_label("Username").fill(UofU.unid)
+        page.get_by_label("Password").fill(UofU.cisPassword)
+        login_button.click()
+        search_link.wait_for()
+        # The file holds session cookies, so it is created readable by the owner only before anything is written
+        state_file = os.open(DDI_STATE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(state_file, "w") as file:
+            json.dump(context.storage_state(), file)
 
     # Search for IP
     page.get_by_role("link", name="Search").click()
@@ -491,19 +937,19 @@ def dns_changer_playwright(
     page.get_by_role("button", name="Search").click()
 
     # Select correct record
-    page.get_by_text(f"Internal/{current_dns}.net.utah.edu").click()
+    page.get_by_text(f"Internal/{current_dns}{DOMAIN_NAME}").click()
 
     # Get current name
     old_dns = page.get_by_label("Name").input_value()
     assert old_dns == current_dns, f"Old DNS: {old_dns}\nCurrent DNS: {current_dns}"  # Should be the same as current_dns
 
     # Update DNS
-    page.get_by_label("Name").fill(desired_dns.removesuffix(".net.utah.edu"))
+    page.get_by_label("Name").fill(desired_dns.removesuffix(DOMAIN_NAME))
 
     # Save changes
     page.get_by_role("button", name="Save & Close").click()
-    sleep(1)  # Wait for save to complete
-    try:  # Check for error message
+    try:  # Wait for the editor to close, it stays open with an error message if the save failed
+        expect(page.get_by_role("button", name="Save & Close")).to_be_hidden(timeout=5000)
         expect(page.get_by_text("Operation not possible due to uniqueness constraint")).to_be_hidden()
         expect(page.get_by_text("Missing value for extensible attribute 'Device Type'.")).to_be_hidden()
     except AssertionError:  # If error message is present, print message and close browser
@@ -512,25 +958,27 @@ def dns_changer_playwright(
         browser.close()
 
     # Select correct record again
-    page.get_by_text(f"Internal/{current_dns}.net.utah.edu").click()
+    page.get_by_text(f"Internal/{current_dns}{DOMAIN_NAME}").click()
 
     # Select Aliases tab
     page.get_by_role("link", name="Aliases").click()
 
     # Add aliases
+    add_button = page.locator("div.ib-inner.ib-ur-host-editor em.x-unselectable > button.ib_h_icon_add")
+    alias_rows = page.locator("div.ib-ur-host-editor div.x-grid3-row")
     for alias in aliases:
-        if page.locator("div.ib-inner.ib-ur-host-editor em.x-unselectable > button.ib_h_icon_add").count() > 1:
-            sleep(1)  # Wait for the duplicate button to be removed
-        page.locator("div.ib-inner.ib-ur-host-editor em.x-unselectable > button.ib_h_icon_add").click()
-        sleep(1)  # Wait for the new row to be added and ready for input
+        expect(add_button).to_have_count(1)  # Wait for any duplicate button to be removed
+        row_count = alias_rows.count()
+        add_button.click()
+        expect(alias_rows).to_have_count(row_count + 1)  # Wait for the new row to be added and ready for input
         page.locator("div.ib-ur-host-editor div.x-grid3-row-last").click()  # Click on the new row to reveal the input field
         page.locator("div.ib-ur-host-editor input.x-form-field").last.fill(alias)  # Fill in the alias
         page.locator("div.ib-ur-host-editor input.x-form-field").last.press("Enter")  # Press enter to save the alias
 
     # Save changes
     page.get_by_role("button", name="Save & Close").click()
-    sleep(1)  # Wait for save to complete
-    try:  # Check for error message
+    try:  # Wait for the editor to close, it stays open with an error message if the save failed
+        expect(page.get_by_role("button", name="Save & Close")).to_be_hidden(timeout=5000)
         expect(page.get_by_text("Operation not possible due to uniqueness constraint")).to_be_hidden()
         expect(page.get_by_text("Missing value for extensible attribute 'Device Type'.")).to_be_hidden()
     except AssertionError:  # If error message is present, print message and close browser
@@ -556,7 +1004,23 @@ def view_orion_node_page(node_id: int):
     """
     node_url =  f"https://orion.sys.utah.edu/Orion/NetPerfMon/NodeDetails.aspx?NetObject=N:{node_id}"
 
-    log.debug(f"Opening Orion Node Page: {node_url}")
+    log.debug("Opening Orion Node Page: %s", node_url)
+
+    # Launch the browser in its own session so this returns right away instead of waiting on the browser
+    opener = {"darwin": "open", "linux": "xdg-open"}.get(sys.platform)
+    if opener:
+        try:
+            subprocess.Popen(
+                [opener, node_url],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            return
+        except FileNotFoundError:
+            log.debug("'%s' not found, falling back to webbrowser", opener)
+
+    import webbrowser
 
     webbrowser.open(node_url)
 
@@ -581,12 +1045,15 @@ def change_display_table(table_title: str, current_name: str, proposed_name: str
     return table
 
 
-def change_switch_info(connection: BaseConnection, correct_name: str, building_number: str, room_number: str) -> None:
+def change_switch_info(switch_ip: str, correct_name: str, building_number: str, room_number: str) -> None:
     """
     Updates the switch information with the correct name, building number, and room number.
 
+    The connection is fetched when the change runs rather than when the switch was checked, so a session that sat
+    idle through the prompts for other switches and was closed by the switch's exec-timeout is reopened.
+
     Args:
-        connection (BaseConnection): The connection object used to communicate with the switch.
+        switch_ip (str): The IP address of the switch.
         correct_name (str): The correct name for the switch.
         building_number (str): The building number where the switch is located.
         room_number (str): The room number where the switch is located.
@@ -594,11 +1061,20 @@ def change_switch_info(connection: BaseConnection, correct_name: str, building_n
     Returns:
         None
     """
+    from netmiko import ConfigInvalidException
+
+    connection = get_connection(switch_ip)
     switch_output = ""
     commands = switch_commands_generator(correct_name, building_number, room_number)
+    # Saving from config mode as the last command saves a separate round trip through save_config
+    if "nxos" in connection.device_type:
+        commands.append("do copy running-config startup-config")
+    else:
+        commands.append("do write memory")
     try:
         switch_output += connection.send_config_set(
             commands,
+            cmd_verify=False,  # The banner is one multi-line command, its echo can't be matched line by line
             error_pattern=r"(Invalid input detected at|Command authorization failed)",
         )
     except ValueError as e:
@@ -606,15 +1082,11 @@ def change_switch_info(connection: BaseConnection, correct_name: str, building_n
     except ConfigInvalidException as e:
         log.error(e)
         print("-" * 80)
-        print("\n".join([cmd.replace("\n", "") for cmd in commands]))
+        print("\n".join(commands))
         print("-" * 80)
     else:
-        connection.set_base_prompt()
-        switch_output += connection.save_config()
-        log.debug(f"Output: {switch_output}")
-    finally:
-        connection.disconnect()  # Disconnect from the switch
-        log.debug("Switch connection closed.")
+        connection.set_base_prompt()  # The hostname changed, so the prompt did too
+        log.debug("Output: %s", switch_output)
 
 
 def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str) -> None:
@@ -636,16 +1108,16 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
     # sys_id for the DNS Update Request catalog item
     sys_id = "a7abab2913c28340af4150782244b0c3"
 
-    duo = Duo(uNID=UofU.unid, password=UofU.cisPassword)
+    from uit_duo import get_form_args
 
-    session: requests.Session = duo.login()
+    session: requests.Session = _get_duo_session()  # The same login the DDI lookups used
 
     response: requests.Response = session.get(base_url, allow_redirects=True)
 
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
     sysparm_url = URL(response.url).query.get("sysparm_url")
 
@@ -654,9 +1126,9 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
-    saml_response = get_form_args(response.text, "SAMLResponse")
+    saml_response = get_form_args(response.content, "SAMLResponse")
     # TODO: Add error handling for when the SAMLResponse is not found
 
     response: requests.Response = session.post(base_url / "navpage.do", data={"SAMLResponse": saml_response})
@@ -664,29 +1136,34 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
     response: requests.Response = session.get(base_url / "it", params={"id": "uu_catalog_item", "sys_id": sys_id})
 
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
     reg = re.compile(r"window\.g_ck = '(.*?)'")
 
     match = reg.search(response.text)
     # TODO: Add error handling for when the regex doesn't match
 
-    # The X-Usertoken header is required to access the ServiceNow API
-    session.headers.update({"X-Usertoken": match.group(1)})
+    # The X-Usertoken header is required to access the ServiceNow API, it is passed per request rather than set on the
+    # session so it isn't sent to toast.utah.edu by the DDI lookups sharing the Duo session
+    servicenow_headers = {"X-Usertoken": match.group(1)}
 
-    response: requests.Response = session.get(base_url / "api/now/sp/page", params={"id": "uu_catalog_item", "sys_id": sys_id})
+    response: requests.Response = session.get(
+        base_url / "api/now/sp/page",
+        params={"id": "uu_catalog_item", "sys_id": sys_id},
+        headers=servicenow_headers,
+    )
 
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
     user_info = response.json()["result"]["user"]
 
@@ -717,14 +1194,15 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
             "get_portal_messages": "true",
             "sysparm_no_validation": "true",
         },
+        headers=servicenow_headers,
     )
 
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
-    log.debug(f"Response: {response.json()}")
+    log.debug("Response: %s", response.json())
     if response.ok:
         log.debug("Ticket created successfully.")
     else:
@@ -741,12 +1219,13 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
             params={
                 "sysparm_query": f"123TEXTQUERY321={request_ticket_ref}^numberSTARTSWITHTASK"
             },
+            headers=servicenow_headers,
         )
 
         try:
             response.raise_for_status()
         except requests.HTTPError as e:
-            log.error(f"HTTP Error: {e}")
+            log.error("HTTP Error: %s", e)
 
         if len(response.json()["result"]) > 0:
             break
@@ -763,24 +1242,25 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
         with open("ticket.json", "w") as f:
             f.write(response.text)
         return False
-    log.debug(f"Task ID: {task_id}")
+    log.debug("Task ID: %s", task_id)
 
     response: requests.Response = session.get(
         base_url / "sc_task.do",
         params={"sys_id": task_id},
+        headers=servicenow_headers,
     )
 
     try:
         response.raise_for_status()
     except requests.HTTPError as e:
-        log.error(f"HTTP Error: {e}")
+        log.error("HTTP Error: %s", e)
 
     log.debug("Attempting to reassign ticket.")
 
     response: requests.Response = session.post(
         base_url / "sc_task.do",
         data={
-            "sysparm_ck": get_form_args(response.text, "sysparm_ck"),
+            "sysparm_ck": get_form_args(response.content, "sysparm_ck"),
             "sys_target": "sc_task",
             "sys_uniqueName": "sys_id",
             "sys_uniqueValue": task_id,  # This is the sys_id of the ticket
@@ -790,6 +1270,7 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
             "sc_task.assignment_group": "d4bb465a6f6a1100c62f8a20af3ee4a9",  # This is the id for UIT - NCI - Network
             "sc_task.assigned_to": user_info["sys_id"],  # Assign the ticket to the requester
         },
+        headers=servicenow_headers,
         allow_redirects=False,
     )
 
@@ -798,123 +1279,157 @@ def create_ticket(dns_ip: str, dns_pop_ip: str, dns_fqhn: str, dns_pop_fqhn: str
         return True
     else:
         log.error("Ticket reassignment failed. Ticket should be sitting in the DDI queue.  Please take the ticket.")
-        log.debug(f"Redirect URL: {response.headers['Location']}\nStatus Code: {response.status_code}")
+        log.debug("Redirect URL: %s\nStatus Code: %s", response.headers['Location'], response.status_code)
         return 
 
 
-def ddi_name_change(ip_address: str, correct_name: str, current_name: str, aliases: list[str] = []) -> None:
-    with sync_playwright() as p:
-        dns_changer_playwright(p, ip_address, correct_name, current_name, aliases)
-        
-    # Checking if the DNS change was successful
+def ddi_name_change(
+    ip_address: str,
+    correct_name: str,
+    current_name: str,
+    host_ref: str,
+    aliases: list[str] = [],
+    use_browser: bool = False,
+) -> None:
+    if use_browser:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            dns_changer_playwright(p, ip_address, correct_name, current_name, aliases)
+    else:
+        dns_changer_wapi(host_ref, correct_name, current_name, aliases)
+
+    # Checking if the DNS change was successful, the cached record is from before the change
+    clear_caches()
     ddi_data = ddi_search(ip_address).get("result")
-    if f"{correct_name}.net.utah.edu" in ddi_data.get("names", "").split(", "):
+    if f"{correct_name}{DOMAIN_NAME}" in get_ddi_names(ddi_data):
         print("DNS change successful.")
     else:
         log.error("DNS change check failed. Please verify the DNS change manually.")
 
 
-def main() -> None:
-    """
-    #TODO
+def gather_switch_info(switch: argparse.Namespace, orion: Orion, progress: Callable[[str], None] = log.debug) -> dict:
     """
+    Gathers what is needed to check a switch's name everywhere it is recorded, without changing anything.
 
-    threads = []  # List to hold the threads
-    orion = Orion("smg-hamp-p01.ad.utah.edu", ORION_USERNAME, ORION_PASSWORD)
-
-    ARGS = get_args()
-
-    match ARGS.log_level:
-        case "debug":
-            log.setLevel(logging.DEBUG)
-        case "info":
-            log.setLevel(logging.INFO)
-        case "warning":
-            log.setLevel(logging.WARNING)
-        case "error":
-            log.setLevel(logging.ERROR)
-        case "critical":
-            log.setLevel(logging.CRITICAL)
-        case _:  # Default to WARNING
-            log.setLevel(logging.WARNING)
+    Args:
+        switch (argparse.Namespace): The switch to check, with the fields in SWITCH_FIELDS.
+        orion (Orion): The Orion client to look the switch up with.
+        progress (Callable[[str], None]): Called with a short message as each step starts.
 
-    log.debug(f"Arguments: {ARGS}")
+    Returns:
+        dict: The switch, its correct name and the current names in the switch,
+        Orion and InfoBlox, plus the InfoBlox host record's reference and the demark aliases.
 
+    Raises:
+        NetmikoAuthenticationException: If the switch rejects the SSH credentials.
+        NetmikoTimeoutException: If the switch can't be reached.
+        ValueError: If the switch isn't in Orion.
+    """
     # Generating the correct name
-    with CONSOLE.status("Gathering Information...") as status:
-        status.update("Generating Correct Name...")
-        correct_name = name_generator(
-            ARGS.function_descriptor,
-            ARGS.count,
-            ARGS.building_number,
-            ARGS.building_short_name,
-            ARGS.room_number,
-            ARGS.distribution_node,
-        )
-        domain_name = ".net.utah.edu"
-        full_name = correct_name + domain_name  # Correct name with domain
+    progress("Generating Correct Name...")
+    correct_name = name_generator(
+        switch.function_descriptor,
+        switch.count,
+        switch.building_number,
+        switch.building_short_name,
+        switch.room_number,
+        switch.distribution_node,
+    )
+    full_name = f"{correct_name}{DOMAIN_NAME}"  # Correct name with domain
+
+    # Orion, InfoBlox and the demark DNS checks don't depend on the switch or each other,
+    # so look them up while connecting to the switch. Not a with block, leaving one on an error would wait for the
+    # lookups still running
+    lookups = ThreadPoolExecutor(max_workers=3)
+    try:
+        orion_future = lookups.submit(orion.get_switch_one, switch.switch_ip)
+        if switch.function_descriptor == "dx":
+            aliases_future = lookups.submit(
+                demark_alias_generator, switch.building_number, switch.count, switch.switch_ip
+            )
+        else:
+            aliases_future = None
 
         # Getting the switch connection
-        status.update("Connecting to Switch...")
-        switch_connection_dict = {
-            "device_type": "autodetect",
-            "host": ARGS.switch_ip,
-            "username": SSH.username,
-            "password": SSH.password,
-        }
-        try:
-            guesser = SSHDetect(**switch_connection_dict)
-        except NetmikoAuthenticationException:
-            log.error("Authentication error. Please check the username and password.")
-            exit(EXIT_GENERAL_ERROR)
-        except NetmikoTimeoutException:
-            log.error("Connection timed out. Please check the IP address and try again.")
-            exit(EXIT_GENERAL_ERROR)
-        best_match = guesser.autodetect()
-        switch_connection_dict["device_type"] = best_match
-        if logging.getLogger().getEffectiveLevel() == logging.DEBUG:
-            dev_device_dict = switch_connection_dict.copy()
-            dev_device_dict["password"] = "********"
-            log.debug(f"Device dictionary: {dev_device_dict}")
-            del dev_device_dict
-        switch_connection = ConnectHandler(**switch_connection_dict)
+        progress("Connecting to Switch...")
+        switch_connection = get_connection(switch.switch_ip)
+
+        # InfoBlox can need a Duo push, so it is only looked up once the switch is known to be reachable
+        ddi_future = lookups.submit(ddi_search, switch.switch_ip)
 
         # Getting the current switch name
-        status.update("Getting Current Switch Name...")
+        progress("Getting Current Switch Name...")
         current_switch_name = get_switch_name(switch_connection)
-        log.debug(f"Current Switch Name: {current_switch_name}")
-
-        # Getting Orion data
-        status.update("Getting Orion Data...")
-        orion_data = orion.get_switch(ARGS.switch_ip).get("results")[0]
-        log.debug(f"Orion Data: {orion_data}")
+        log.debug("Current Switch Name: %s", current_switch_name)
+
+        # Getting Orion and InfoBlox data
+        progress("Getting Orion and InfoBlox Data...")
+        orion_row = orion_future.result()
+        if orion_row is None:
+            raise ValueError(f"{switch.switch_ip} was not found in Orion")
+        log.debug("Orion Data: %s", orion_row)
+        ddi_data = ddi_future.result().get("result")
+    finally:
+        lookups.shutdown(wait=False, cancel_futures=True)
 
-        uri = orion_data["URI"]
-        node_name = orion_data["NodeName"]
+    # Check if DNS change is allowed, and keep the record's reference to change it with
+    ddi_name = dns_change_allowed_checker(ddi_data)
+    ddi_ref = get_host_record_ref(ddi_data) if ddi_name else None
 
-        # Getting InfoBlox data
-        status.update("Getting InfoBlox Data...")
-        ddi_data = ddi_search(ARGS.switch_ip).get("result")
+    # Get the dns names
+    ddi_names = get_ddi_names(ddi_data)
 
-        # Check if DNS change is allowed
-        ddi_name = dns_change_allowed_checker(ddi_data)
+    if ddi_name:
+        log.debug("Host Record DNS Name: %s", ddi_name)
+    else:
+        log.debug("Automatic DNS Change Not Allowed, Manual Change Required. First DNS Name Found: %s", ddi_names[0])
+
+    # Get the aliases
+    aliases = aliases_future.result() if aliases_future else []
+    log.debug("Aliases: %s", aliases)
+
+    return {
+        "switch": switch,
+        "correct_name": correct_name,
+        "full_name": full_name,
+        "current_switch_name": current_switch_name,
+        "uri": orion_row.uri,
+        "node_name": orion_row.node_name,
+        "ddi_name": ddi_name,
+        "ddi_ref": ddi_ref,
+        "ddi_names": ddi_names,
+        "aliases": aliases,
+    }
+
+
+def apply_changes(info: dict, orion: Orion, executor: ThreadPoolExecutor, use_browser: bool = False) -> list[Future]:
+    """
+    Shows each name mismatch for a switch and makes the changes the user confirms.
 
-        # Get the dns names
-        ddi_names = ddi_data.get("names", "").split(", ")
+    The changes run on the executor so the next prompt can be shown while they are being made.
 
-        if ddi_name:
-            log.debug(f"Host Record DNS Name: {ddi_name}")
-        else:
-            log.debug(f"Automatic DNS Change Not Allowed, Manual Change Required. First DNS Name Found: {ddi_names[0]}")
+    Args:
+        info (dict): The switch information from gather_switch_info.
+        orion (Orion): The Orion client to rename the node with.
+        executor (ThreadPoolExecutor): The executor to make the changes on.
+        use_browser (bool): Change the DNS name through the InfoBlox web UI rather than the API.
 
-        # Get the aliases
-        if ARGS.function_descriptor == "dx":
-            aliases = demark_alias_generator(
-                ARGS.building_number, ARGS.count, ARGS.switch_ip
-            )
-        else:
-            aliases = []
-        log.debug(f"Aliases: {aliases}")
+    Returns:
+        list[Future]: The futures for the confirmed changes.
+    """
+    futures = []  # List to hold the changes being made
+    switch = info["switch"]
+    correct_name = info["correct_name"]
+    full_name = info["full_name"]
+    current_switch_name = info["current_switch_name"]
+    ddi_name = info["ddi_name"]
+    ddi_names = info["ddi_names"]
+    aliases = info["aliases"]
+
+    if current_switch_name == correct_name and info["node_name"] == full_name and full_name in ddi_names:
+        rprint(f"[green]All names consistent for '{switch.switch_ip}': {correct_name}[/green]")
+        return futures
 
     # Prompt to change switch name if necessary
     if current_switch_name != correct_name:
@@ -925,41 +1440,28 @@ def main() -> None:
 
         # Prompt to change the switch name
         if Confirm.ask(f"Would you like to change the switch name to '{correct_name}'?"):
-            switch_thread = Thread(
-                target=change_switch_info,
-                args=(
-                    switch_connection,
-                    correct_name,
-                    ARGS.building_number,
-                    ARGS.room_number,
-                ),
-            )
-            threads.append(switch_thread)
-            log.debug(f"Threads: {threads}")
-            switch_thread.start()
+            futures.append(executor.submit(
+                change_switch_info,
+                switch.switch_ip,
+                correct_name,
+                switch.building_number,
+                switch.room_number,
+            ))
         else:
-            log.debug("Switch name will not be changed. Disconnecting from switch.")
-            switch_connection.disconnect()
+            log.debug("Switch name will not be changed.")
     else:
-        log.debug("Switch name matches correct name. Disconnecting from switch.")
-        switch_connection.disconnect()
+        log.debug("Switch name matches correct name.")
 
     # Prompt to change Orion node name if necessary
-    if node_name != full_name:
+    if info["node_name"] != full_name:
         log.debug("Mismatch between switch name and Orion name.")
 
         # Display the mismatch
-        rprint(change_display_table("Orion Name Mismatch", node_name, full_name))
+        rprint(change_display_table("Orion Name Mismatch", info["node_name"], full_name))
 
         # Prompt to change the Orion node name
         if Confirm.ask(f"Would you like to change the Orion node name to '{correct_name}'?"):
-            orion_thread = Thread(
-                target=orion.change_orion_node_name,
-                args=(uri, correct_name),
-            )
-            threads.append(orion_thread)
-            log.debug(f"Threads: {threads}")
-            orion_thread.start()
+            futures.append(executor.submit(orion.change_orion_node_name, info["uri"], correct_name))
 
     # Prompt to change InfoBlox name if necessary
     if full_name not in ddi_names:
@@ -972,24 +1474,111 @@ def main() -> None:
         # If the ddi_name is None meaning the DNS change is not allowed, the user will have to change it manually
         # and should not be prompted to try automatically changing it
         if ddi_name and Confirm.ask(f"Would you like to try automatically changing the DNS?"):
-            ddi_thread = Thread(
-                target=ddi_name_change,
-                args=(ARGS.switch_ip, correct_name, ddi_name, aliases),
-            )
-            threads.append(ddi_thread)
-            log.debug(f"Threads: {threads}")
-            ddi_thread.start()
+            futures.append(executor.submit(
+                ddi_name_change, switch.switch_ip, correct_name, ddi_name, info["ddi_ref"], aliases, use_browser
+            ))
         else:  # If the DNS name cannot be changed automatically or the user chooses not to
             log.debug("DNS name will not be changed automatically.")
             rprint(
-                f"The proper switch name for '{ARGS.switch_ip}' should be: '{correct_name}' with the domain '{domain_name}' and the aliases: '{'\', \''.join(aliases)}'"
+                f"The proper switch name for '{switch.switch_ip}' should be: '{correct_name}' with the domain '{DOMAIN_NAME}' and the aliases: '{'\', \''.join(aliases)}'"
             )
 
         # Prompt to create a ticket for the DNS change
         if Confirm.ask("Would you like a ticket to be created for this change?", default=True):
-            if create_ticket(ARGS.switch_ip, ARGS.switch_ip, ddi_name or ddi_names[0], full_name):
+            if create_ticket(switch.switch_ip, switch.switch_ip, ddi_name or ddi_names[0], full_name):
                 print("Ticket created successfully.")
 
+    return futures
+
+
+def main() -> None:
+    """
+    Checks the name of one switch, or every switch in a batch file, and offers to fix any mismatches.
+
+    Information for every switch is gathered first (in parallel in batch mode), then the mismatches are
+    shown and confirmed one switch at a time so the prompts don't interleave.
+    """
+    ARGS = get_args()
+
+    # netmiko pulls in paramiko and cryptography, it is only loaded once the arguments are known to be good
+    from netmiko import NetmikoAuthenticationException, NetmikoTimeoutException
+
+    orion = get_orion("smg-hamp-p01.ad.utah.edu", ORION_USERNAME, ORION_PASSWORD)
+    load_device_type_cache()  # Device types found in previous runs
+
+    match ARGS.log_level:
+        case "debug":
+            log.setLevel(logging.DEBUG)
+        case "info":
+            log.setLevel(logging.INFO)
+        case "warning":
+            log.setLevel(logging.WARNING)
+        case "error":
+            log.setLevel(logging.ERROR)
+        case "critical":
+            log.setLevel(logging.CRITICAL)
+        case _:  # Default to WARNING
+            log.setLevel(logging.WARNING)
+
+    log.debug("Arguments: %s", ARGS)
+
+    if not ARGS.batch:
+        with CONSOLE.status("Gathering Information...") as status:
+            try:
+                infos = [gather_switch_info(ARGS, orion, status.update)]
+            except NetmikoAuthenticationException:
+                log.error("Authentication error. Please check the username and password.")
+                exit(EXIT_GENERAL_ERROR)
+            except NetmikoTimeoutException:
+                log.error("Connection timed out. Please check the IP address and try again.")
+                exit(EXIT_GENERAL_ERROR)
+            except ValueError as e:
+                log.error(e)
+                exit(EXIT_GENERAL_ERROR)
+    else:
+        switches = read_batch_file(ARGS.batch)
+        infos = []
+        with CONSOLE.status(f"Gathering Information for {len(switches)} switches..."):
+            # One Orion query for the whole file, gather_switch_info then finds each switch in the client's cache
+            orion.get_switches([switch.switch_ip for switch in switches])
+            with ThreadPoolExecutor(max_workers=ARGS.workers) as executor:
+                futures = [executor.submit(gather_switch_info, switch, orion) for switch in switches]
+            # Results are read in file order so the prompts follow the CSV
+            for switch, future in zip(switches, futures):
+                try:
+                    infos.append(future.result())
+                except NetmikoAuthenticationException:
+                    log.error("%s - Authentication error. Please check the username and password.", switch.switch_ip)
+                except NetmikoTimeoutException:
+                    log.error("%s - Connection timed out. Please check the IP address.", switch.switch_ip)
+                except Exception as e:
+                    log.error("%s - Unable to gather information: %s", switch.switch_ip, e)
+
+    save_device_type_cache()  # Saved before the prompts so it isn't lost if they are cancelled
+
+    # Confirmed changes are never cancelled, the script always waits for them to finish before exiting
+    futures: dict[Future, str] = {}
+    with ThreadPoolExecutor() as changes:
+        for info in infos:
+            if ARGS.batch:
+                rprint(f"[bold]{info['switch'].switch_ip}[/bold] - {info['correct_name']}")
+            for future in apply_changes(info, orion, changes, ARGS.use_browser):
+                futures[future] = info["switch"].switch_ip
+
+        # One shared deadline for all the changes rather than CHANGE_TIMEOUT for each in turn, after which the
+        # changes still running are reported so a hung one doesn't look like the script has stalled
+        _, not_done = wait(futures, timeout=CHANGE_TIMEOUT)
+        for future in not_done:
+            log.warning(
+                "%s - A change is still running after %s seconds, waiting for it to finish.",
+                futures[future],
+                CHANGE_TIMEOUT,
+            )
+
+    for future, switch_ip in futures.items():
+        if future.exception() is not None:
+            log.error("%s - A change failed: %s", switch_ip, future.exception())
+
 
 if __name__ == "__main__":
     try:
@@ -998,5 +1587,5 @@ if __name__ == "__main__":
         log.info("\nCtrl + c pressed. Exiting script...")
         exit(EXIT_KEYBOARD_INTERRUPT)
     except Exception as e:
-        log.exception(f"An unhandled error occurred: {e}")
+        log.exception("An unhandled error occurred: %s", e)
         exit(EXIT_GENERAL_ERROR)
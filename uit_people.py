@@ -17,10 +17,10 @@ from rich.panel import Panel
 import requests
 from rich import print as rprint
 from yarl import URL
-from bs4 import BeautifulSoup
 import pandas as pd
 
 # Local libraries
+from uit_duo import get_form_args
 
 
 # Standard exit codes
@@ -64,28 +64,6 @@ def get_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def get_form_args(html_doc: str, name) -> str:
-    """
-    Retrieves the value of an HTML attribute with the specified name from the given HTML document.
-
-    Args:
-        html_doc (str): The HTML document as a string.
-        name: The name of the attribute to retrieve.
-
-    Returns:
-        str: The value of the attribute.
-
-    Raises:
-        KeyError: If the attribute with the specified name is not found.
-    """
-    try:
-        return BeautifulSoup(html_doc, "html.parser").find(attrs={"name": name})[
-            "value"
-        ]
-    except (TypeError, KeyError):
-        raise KeyError(f"{name} not found")
-
-
 def fix_email_string(email: str) -> str:
     """
     Fix the email string by removing any extra characters.
@@ -177,7 +155,7 @@ def basic_search(search_term: str) -> list[dict[str, str]]:
     # Perform the search
     search_data = {
         "searchTerm": search_term,
-        "_csrf": get_form_args(response.text, "_csrf"),
+        "_csrf": get_form_args(response.content, "_csrf"),
     }
     response: requests.Response = session.post(
         url=BASE_URL / "uWho/basic.hml", data=search_data
@@ -58,7 +58,7 @@ class SNow:
         except requests.HTTPError as e:
             log.error(f"HTTP Error: {e}")
 
-        saml_response = get_form_args(response.text, "SAMLResponse")
+        saml_response = get_form_args(response.content, "SAMLResponse")
         # TODO: Add error handling for when the SAMLResponse is not found
 
         response: requests.Response = self._session.post(